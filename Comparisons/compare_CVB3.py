@@ -122,11 +122,6 @@ def export_primer_set(primer_df, nodes, protein_name, method):
     return pd.DataFrame(rows)
 
 
-def rc(seq: str) -> str:
-    tbl = str.maketrans("ACGTacgt", "TGCAtgca")
-    return seq.translate(tbl)[::-1]
-
-
 def find_unique(haystack: str, needle: str, prev_pos):
     """Return 0-based index of first occurrence at/after prev_pos; raise if not found."""
     p = haystack.find(needle, prev_pos)
@@ -168,7 +163,7 @@ def main():
     for tile in sorted(CVB3_PRIMERS.keys()):
         fwd = CVB3_PRIMERS[tile][0].upper()
         rev = CVB3_PRIMERS[tile][1].upper()
-        rc_rev = rc(rev)
+        rc_rev = GU.revcomp(rev)
 
         # find forward primer starting at search_pos
         f_hit = find_unique(sequence_nt, fwd, search_pos)
@@ -261,17 +256,25 @@ def main():
     primer_path = results_dir / "CVB3_primers.csv"
     df_all.to_csv(primer_path, index=False)
 
-    # sample 1000 random paths for null distribution 
-    sampled_paths = GU.sample_paths_dag_uniform(graph,  's', 'd', k=1000, max_tries=1000, seed=42)
-
-    # save null paths
-    export_null_paths_primers_py(
-        paths=sampled_paths,
-        template_5to3=sequence_nt,
-        out_csv_path=results_dir / "null_paths_primers_CVB3.csv",
-        protein_name=protein_name,
-        method="NullWeighted", cfg=cfg
-    )
+    # sample random paths from the graph for null distribution
+    null_csv_path = results_dir / "null_paths_primers_CVB3.csv"
+    if args.null_sampler == "batched":
+        # batches of NumPy walkers, streamed to the CSV chunk by chunk
+        sampler = GU.PathSampler(graph, 's', 'd')
+        GU.export_null_path_batches(
+            sampler.sample(args.null_paths, seed=42), sampler.labels, sequence_nt,
+            null_csv_path, cfg, protein_name, method="NullWeighted"
+        )
+    else:
+        sampled_paths = GU.sample_paths_dag_exact(graph, 's', 'd', k=args.null_paths, seed=42)
+
+        export_null_paths_primers_py(
+            paths=sampled_paths,
+            template_5to3=sequence_nt,
+            out_csv_path=null_csv_path,
+            protein_name=protein_name,
+            method="NullWeighted", cfg=cfg
+        )
     print("✔ Null primer paths written")
 
 
@@ -288,16 +288,25 @@ def main():
         index=False,
     )
 
-    # sample 1000 random paths from the graph for null distribution 
-    sampled_paths = GU.sample_paths_dag_uniform(graph,  's', 'd', k=1000, max_tries=1000, seed=42)
-
-    export_null_paths_primers_py(
-        paths=sampled_paths,
-        template_5to3=sequence_nt,
-        out_csv_path=results_dir / "null_paths_primers_SPAP.csv",
-        protein_name=protein_name,
-        method="NullWeighted", cfg=cfg
-    )
+    # sample random paths from the graph for null distribution
+    null_csv_path = results_dir / "null_paths_primers_SPAP.csv"
+    if args.null_sampler == "batched":
+        # batches of NumPy walkers, streamed to the CSV chunk by chunk
+        sampler = GU.PathSampler(graph, 's', 'd')
+        GU.export_null_path_batches(
+            sampler.sample(args.null_paths, seed=42), sampler.labels, sequence_nt,
+            null_csv_path, cfg, protein_name, method="NullWeighted"
+        )
+    else:
+        sampled_paths = GU.sample_paths_dag_exact(graph, 's', 'd', k=args.null_paths, seed=42)
+
+        export_null_paths_primers_py(
+            paths=sampled_paths,
+            template_5to3=sequence_nt,
+            out_csv_path=null_csv_path,
+            protein_name=protein_name,
+            method="NullWeighted", cfg=cfg
+        )
     print("✔ Null primer paths written")
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from pathlib import Path
+from General.primer_graphs import create_primer_df, create_graph
+from General.args import get_args
+import General.utils as GU
+
+
+def build(primer_df, mutreg_l, args, builder):
+    """Build one graph and return (row fields) with time and peak memory."""
+    tracemalloc.start()
+    t0 = time.time()
+    try:
+        graph = create_graph(primer_df, mutreg_l, args, builder=builder)
+        status = "OK"
+        nodes, edges = len(graph.nodes), len(graph.edges)
+        del graph
+    except RecursionError:
+        status = "RecursionError"
+        nodes = edges = None
+    build_time = time.time() - t0
+    peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return {
+        "builder": builder,
+        "status": status,
+        "graph_nodes": nodes,
+        "graph_edges": edges,
+        "build_time_sec": round(build_time, 3),
+        "build_peak_mem_MB": round(peak_mb, 1),
+    }
+
+
+def main():
+    """
+    Compare the recursive and iterative graph builders on prefixes of the CVB3 genome.
+    Uses the same flanks and oligo lengths as Comparisons/compare_CVB3.py.
+    """
+    args = get_args()
+
+    args.output = "Results"
+    args.oligo_lmin = 240
+    args.oligo_lmax = 260
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cfg = GU.load_config("configs/CVB3_experiment.json")
+    full_mutreg_nt = GU.read_fasta("data/CVB3_reference.fa")
+
+    rows = []
+    for seq_length in (1000, 2000, 4000, len(full_mutreg_nt)):
+        mutreg_nt = full_mutreg_nt[:seq_length]
+        sequence_nt = (cfg.upstream + mutreg_nt + cfg.downstream).upper()
+
+        print(f"[INFO] Sequence length {seq_length}: building primer table...")
+        primer_df = create_primer_df(sequence_nt, args, cfg)
+
+        for builder in ("recursive", "iterative"):
+            row = {"seq_length": seq_length, "recursion_limit": sys.getrecursionlimit()}
+            row.update(build(primer_df, len(mutreg_nt), args, builder))
+            print(f"[DONE] {builder}: {row['status']}, {row['build_time_sec']} sec, "
+                  f"peak {row['build_peak_mem_MB']} MB")
+            rows.append(row)
+
+    csv_path = output_dir / "graph_builder_benchmark.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"[SAVE] Benchmark results → {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import re
+import subprocess
+import sys
+import pandas as pd
+from pathlib import Path
+
+# solver module imported by tool.py for each --version
+VERSION_MODULES = {
+    "tool (no version)": "tool",
+    "PD-single-LPath": "PD_single_LPath.run_pd_single_LPath",
+    "PD-mul-Greedy": "PD_mul_greedy.run_mul_greedy",
+    "PD-mul-ILP": "PD_mul_ILP.run_mul_ilp",
+    "PD-var-ILP": "PD_var_ILP.run_var_ilp",
+}
+
+# heavy third-party packages reported separately
+PACKAGES = ["gurobipy", "networkx", "Bio", "pandas", "primer3"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+REPEATS = 5
+
+
+def import_times(module):
+    """
+    Import `module` in a fresh interpreter with `python -X importtime` and return
+    {top-level module name: cumulative import time in microseconds}.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import tool, {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative, name = int(match.group(2)), match.group(4)
+        # a package may be imported from several places; keep its outermost (largest) entry
+        times[name] = max(times.get(name, 0), cumulative)
+    return times
+
+
+def main():
+    """
+    Report the import time of tool.py plus the solver module of each version, with the
+    share taken by gurobipy, networkx, Biopython, pandas and primer3 (0 when not loaded).
+    """
+    output_dir = Path("Results")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = []
+    for version, module in VERSION_MODULES.items():
+        # fastest of several cold interpreters, to reduce noise from the OS file cache
+        runs = [import_times(module) for _ in range(REPEATS)]
+        times = {name: min(run.get(name, 0) for run in runs) for name in runs[0]}
+        row = {
+            "version": version,
+            "module": module,
+            "total_ms": round((times.get("tool", 0) + (times.get(module, 0) if module != "tool" else 0)) / 1000, 1),
+        }
+        for package in PACKAGES:
+            row[f"{package}_ms"] = round(times.get(package, 0) / 1000, 1)
+        print(f"[DONE] {version}: {row['total_ms']} ms")
+        rows.append(row)
+
+    csv_path = output_dir / "import_time_benchmark.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"[SAVE] Benchmark results → {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
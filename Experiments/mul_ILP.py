@@ -51,7 +51,8 @@ def main():
         print("Finding forbidden pairs across proteins...")
         t_forbid = time.time()
         single_forbidden, multiple_forbidden, single_pair_cnt, multi_pairs_cnt = find_forbidden_pairs(
-            protein_names, sequences_nt, args,cfg
+            protein_names, sequences_nt, args,cfg,
+            graphs=graphs if args.forbidden_scope == "graph" else None
         )
         forbidden_time = time.time() - t_forbid
         print(f"[DONE] Forbidden pairs in {forbidden_time:.2f} sec "
@@ -0,0 +1,73 @@
+import math
+import time
+import pandas as pd
+from pathlib import Path
+from General.primer_graphs import create_primer_df, create_graph
+from General.csr_graph import CSRGraph
+from General.args import get_args
+import General.utils as GU
+
+
+def time_sampler(graph, counting, k):
+    """Sample k null paths with one counting mode and return (row fields)."""
+    t0 = time.time()
+    paths = GU.sample_paths_dag_uniform(graph, 's', 'd', k=k, max_tries=k, seed=42, counting=counting)
+    return {
+        "counting": counting,
+        "paths_sampled": len(paths),
+        "sample_time_sec": round(time.time() - t0, 3),
+    }
+
+
+def main():
+    """
+    Time null-path sampling with exact integer and log-space path counts on prefixes of
+    the CVB3 genome. Uses the same flanks and oligo lengths as Comparisons/compare_CVB3.py.
+    """
+    args = get_args()
+
+    args.output = "Results"
+    args.oligo_lmin = 240
+    args.oligo_lmax = 260
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cfg = GU.load_config("configs/CVB3_experiment.json")
+    full_mutreg_nt = GU.read_fasta("data/CVB3_reference.fa")
+
+    rows = []
+    for seq_length in (2500, 3000, 3500, 4000, len(full_mutreg_nt)):
+        mutreg_nt = full_mutreg_nt[:seq_length]
+        sequence_nt = (cfg.upstream + mutreg_nt + cfg.downstream).upper()
+
+        print(f"[INFO] Sequence length {seq_length}: building primer graph...")
+        primer_df = create_primer_df(sequence_nt, args, cfg)
+        graph = create_graph(primer_df, len(mutreg_nt), args)
+
+        if not graph.has_node('d'):
+            print(f"[WARN] No s->d path for length {seq_length}. Skipping.")
+            continue
+
+        # number of s->d paths, reported as log10 (too large for fixed-width integers)
+        csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        log_paths = GU._log_path_counts(csr, csr.index['d'])[csr.index['s']]
+
+        for counting in ("exact", "log"):
+            row = {
+                "seq_length": seq_length,
+                "graph_nodes": len(graph.nodes),
+                "graph_edges": len(graph.edges),
+                "log10_paths": round(log_paths / math.log(10), 1),
+            }
+            row.update(time_sampler(graph, counting, args.null_paths))
+            print(f"[DONE] {counting}: {row['paths_sampled']} paths in {row['sample_time_sec']} sec")
+            rows.append(row)
+
+    csv_path = output_dir / "path_sampling_benchmark.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"[SAVE] Benchmark results → {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import timeit
+import pandas as pd
+from pathlib import Path
+from Bio.Seq import Seq
+from General.args import get_args
+from General.primer_data import encode_nt
+import General.utils as GU
+
+
+def seq_revcomp(seq):
+    # the previous implementation of GU.revcomp
+    return str(Seq(seq).reverse_complement())
+
+
+def time_per_call(func, items, repeats):
+    """Best-of-`repeats` time per call (microseconds) of func over every item."""
+    best = min(timeit.repeat(lambda: [func(x) for x in items], number=1, repeat=repeats))
+    return best / len(items) * 1e6
+
+
+def main():
+    """
+    Microbenchmark of the reverse complement: Bio.Seq vs. the translate table in
+    General.utils.revcomp on every primer window of SpAP (lengths --primer_lmin..--primer_lmax),
+    and Bio.Seq vs. translate vs. 2-bit code arrays on the whole CVB3 genome.
+    """
+    args = get_args()
+
+    output_dir = Path("Results")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cfg = GU.load_config("configs/SPAP_experiment.json")
+    _, full_sequences, _ = GU.read_sequences("data/SPAP_reference.txt", cfg)
+    sequence_nt = full_sequences[0]
+
+    windows = [sequence_nt[i:i + L]
+               for L in range(args.primer_lmin, args.primer_lmax + 1)
+               for i in range(len(sequence_nt) - L + 1)]
+    assert all(GU.revcomp(w) == seq_revcomp(w) for w in windows)
+
+    # whole templates (the CVB3 genome), where the 2-bit array form applies
+    genome = GU.read_fasta("data/CVB3_reference.fa").upper()
+    genome_codes = encode_nt(genome)
+    assert (GU.revcomp(genome_codes) == encode_nt(GU.revcomp(genome))).all()
+
+    rows = []
+    for workload, name, func, items in (
+            ("primer windows", "Bio.Seq (str)", seq_revcomp, windows),
+            ("primer windows", "translate (str)", GU.revcomp, windows),
+            ("CVB3 genome", "Bio.Seq (str)", seq_revcomp, [genome]),
+            ("CVB3 genome", "translate (str)", GU.revcomp, [genome]),
+            ("CVB3 genome", "2-bit array", GU.revcomp, [genome_codes])):
+        us = time_per_call(func, items, repeats=5 if len(items) > 1 else 200)
+        print(f"[DONE] {workload}, {name}: {us:.3f} us per call")
+        rows.append({"workload": workload, "method": name, "calls": len(items),
+                     "us_per_call": round(us, 3)})
+
+    csv_path = output_dir / "revcomp_benchmark.csv"
+    pd.DataFrame(rows).to_csv(csv_path, index=False)
+    print(f"[SAVE] Benchmark results → {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import itertools as it
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from General.args import get_args
+import General.utils as GU
+import PD_mul_ILP.brute_force as BF
+
+# longest complementary run of a window pair, capped at MAX_RUN (last stratum is ">= MAX_RUN")
+MAX_RUN = 16
+
+# primer3 evaluations per stratum (every pair if the stratum is smaller)
+SAMPLES_PER_STRATUM = 20000
+
+_G = {}
+
+
+def longest_seed(seq1, seq2, lmax):
+    """Longest complementary seed (capped at MAX_RUN) of every Lmax window pair, indexed [p1, p2]."""
+    n1, n2 = len(seq1) - lmax + 1, len(seq2) - lmax + 1
+    runs = np.zeros((n1, n2), dtype=np.int8)
+    for k in range(1, MAX_RUN + 1):
+        hits = BF.seed_hits(seq1, seq2, k)
+        for p1 in range(n1):
+            runs[p1, BF.seed_candidates(p1, hits, len(seq2), lmax, k)] = k
+    return runs
+
+
+def tested_pairs(n1, n2, lmax, allowed_overlap, intra):
+    """Window pairs Stage 1 tests: every pair between two sequences, p2 to the right within one."""
+    if not intra:
+        return np.ones((n1, n2), dtype=bool)
+    p1 = np.arange(n1)[:, None]
+    p2 = np.arange(n2)[None, :]
+    return p2 >= np.maximum(p1 + 1, p1 + lmax - allowed_overlap)
+
+
+def strata(sequences_nt, args):
+    """Yield (i, j, runs, tested) for each sequence pair in the order of find_forbidden_pairs."""
+    lmax = args.primer_lmax
+    pairs = [(i, i) for i in range(len(sequences_nt))] + list(it.combinations(range(len(sequences_nt)), 2))
+    for i, j in pairs:
+        runs = longest_seed(sequences_nt[i], sequences_nt[j], lmax)
+        yield i, j, runs, tested_pairs(*runs.shape, lmax, args.allowed_overlap, i == j)
+
+
+def _init_worker(sequences_nt, lmax):
+    _G["seqs"] = sequences_nt
+    _G["lmax"] = lmax
+    _G["PCR"] = GU.get_PCR()
+
+
+def _heterodimer_tm(task):
+    i, j, p1, p2 = task
+    lmax = _G["lmax"]
+    return _G["PCR"].calc_heterodimer(_G["seqs"][i][p1:p1 + lmax], _G["seqs"][j][p2:p2 + lmax]).tm
+
+
+def main():
+    """
+    Calibrate the Stage-1 seed length of PD-mul-ILP (--seed_k) on data/10_protein_coding_sequences.txt.
+
+    Every Lmax window pair tested by Stage 1 is put in a stratum by its longest complementary
+    run. The heterodimer Tm is computed for a random sample of each stratum (every pair of the
+    small ones). A seed length k only skips the strata below k, so the recommended seed_k is the
+    shortest run with a true positive (Tm >= max_tm).
+    """
+    args = get_args()
+
+    output_dir = Path("Results")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    cfg = GU.load_config()
+    _, sequences_nt, _ = GU.read_sequences("data/10_protein_coding_sequences.txt", cfg)
+    rng = np.random.default_rng(42)
+
+    # pass 1: stratum sizes
+    sizes = np.zeros(MAX_RUN + 1, dtype=np.int64)
+    for _, _, runs, tested in strata(sequences_nt, args):
+        sizes += np.bincount(runs[tested], minlength=MAX_RUN + 1)
+    print(f"[INFO] {sizes.sum()} window pairs, by longest complementary run: {sizes.tolist()}")
+
+    # pass 2: Bernoulli sample of each stratum
+    keep = np.minimum(1.0, SAMPLES_PER_STRATUM / np.maximum(sizes, 1))
+    tasks, task_runs = [], []
+    for i, j, runs, tested in strata(sequences_nt, args):
+        p1, p2 = np.nonzero(tested)
+        r = runs[p1, p2]
+        pick = rng.random(len(r)) < keep[r]
+        tasks.extend(zip(it.repeat(i), it.repeat(j), p1[pick].tolist(), p2[pick].tolist()))
+        task_runs.append(r[pick])
+    task_runs = np.concatenate(task_runs)
+    print(f"[INFO] Computing {len(tasks)} heterodimer Tm values with {args.workers} worker(s)...")
+
+    with mp.get_context("spawn").Pool(processes=args.workers, initializer=_init_worker,
+                                      initargs=(sequences_nt, args.primer_lmax)) as pool:
+        tm = np.fromiter(pool.imap(_heterodimer_tm, tasks, chunksize=256), dtype=np.float64, count=len(tasks))
+
+    rows = []
+    for run in range(MAX_RUN + 1):
+        in_run = task_runs == run
+        rows.append({
+            "longest_run": run,
+            "window_pairs": int(sizes[run]),
+            "evaluated": int(in_run.sum()),
+            "true_positives": int((tm[in_run] >= cfg.max_tm).sum()),
+            "max_tm": round(float(tm[in_run].max()), 1) if in_run.any() else None,
+        })
+    df = pd.DataFrame(rows)
+    # what seed_k = longest_run would test and skip
+    df["pairs_tested_at_seed_k"] = df["window_pairs"][::-1].cumsum()[::-1]
+    df["true_positives_skipped_at_seed_k"] = df["true_positives"].cumsum() - df["true_positives"]
+
+    with_tp = df.loc[df["true_positives"] > 0, "longest_run"]
+    if len(with_tp):
+        print(f"[DONE] Recommended --seed_k {with_tp.min()} "
+              f"({df.loc[with_tp.min(), 'pairs_tested_at_seed_k']} of {sizes.sum()} pairs tested)")
+
+    csv_path = output_dir / "seed_calibration.csv"
+    df.to_csv(csv_path, index=False)
+    print(f"[SAVE] Calibration results → {csv_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,84 @@
 import itertools as it
+import numpy as np
+
+
+class PrimerStore:
+    """
+    Dense, integer-indexed copy of the primer_df features used while building graphs.
+
+    Every (start, stop, strand) maps arithmetically to an ID
+        ((start - start_min) * n_len + (stop - start - lmin)) * 2 + is_r
+    and features live in flat NumPy arrays indexed by that ID, so graph construction
+    does not pay pandas MultiIndex lookups.
+    """
+
+    def __init__(self, primer_df):
+        index = primer_df.index
+        starts = index.get_level_values('start').to_numpy(dtype=np.int64)
+        stops = index.get_level_values('stop').to_numpy(dtype=np.int64)
+        is_r = (index.get_level_values('fr') == 'r')
+
+        lens = stops - starts
+        self.start_min = int(starts.min())
+        self.start_max = int(starts.max())
+        self.lmin = int(lens.min())
+        self.lmax = int(lens.max())
+        self.max_stop = int(stops.max())
+        self.n_len = self.lmax - self.lmin + 1
+
+        size = (self.start_max - self.start_min + 1) * self.n_len * 2
+        ids = self.ids(starts, stops, is_r)
+
+        self.valid = np.zeros(size, dtype=bool)
+        self.valid[ids] = True
+        self.efficiency = np.full(size, np.nan)
+        self.efficiency[ids] = primer_df['efficiency'].to_numpy()
+        self.tm = np.full(size, np.nan)
+        self.tm[ids] = primer_df['tm'].to_numpy()
+        self.gc = np.full(size, np.nan)
+        self.gc[ids] = primer_df['gc'].to_numpy()
+
+    def ids(self, starts, stops, is_r):
+        """Vectorized ID of (start, stop, strand) arrays (no bounds checks)."""
+        return ((starts - self.start_min) * self.n_len + (stops - starts - self.lmin)) * 2 + is_r
+
+    def lookup(self, starts, stops, is_r):
+        """Vectorized ID lookup; -1 where (start, stop, strand) is not in the table."""
+        lens = stops - starts
+        ok = ((starts >= self.start_min) & (starts <= self.start_max) &
+              (lens >= self.lmin) & (lens <= self.lmax))
+        ids = np.where(ok, self.ids(starts, stops, is_r), 0)
+        ok &= self.valid[ids]
+        return np.where(ok, ids, -1)
+
+    def id_of(self, start, stop, is_r=False):
+        """ID of one primer; raises KeyError like primer_df.at if it is not in the table."""
+        l = stop - start
+        if (self.start_min <= start <= self.start_max) and (self.lmin <= l <= self.lmax):
+            pid = ((start - self.start_min) * self.n_len + (l - self.lmin)) * 2 + int(is_r)
+            if self.valid[pid]:
+                return pid
+        raise KeyError((start, stop, ("r" if is_r else "f")))
+
+    def tup(self, pid):
+        """(start, stop, fr) key of an ID, as used for graph nodes and primer_df rows."""
+        pos, is_r = divmod(int(pid), 2)
+        start_off, l_off = divmod(pos, self.n_len)
+        start = start_off + self.start_min
+        return (start, start + l_off + self.lmin, ("r" if is_r else "f"))
+
 
 class Primer:
-    def __init__(self, primer_df, start, stop, is_r=False):
+    __slots__ = ('start', 'stop', 'is_r', 'l', 'id', 'w')
+
+    def __init__(self, store, start, stop, is_r=False):
         assert start < stop
         self.start = start
         self.stop = stop
         self.is_r = is_r  # forward or reverse
         self.l = stop - start  # length
-        self.primer_df = primer_df
-        self.w = primer_df.at[self.tup(), 'efficiency']  # total cost value; the fancy notation is b/c
-        # of the hierarchal lookup system in panda.df
+        self.id = store.id_of(start, stop, is_r)  # dense index into the PrimerStore arrays
+        self.w = store.efficiency[self.id]  # total cost value
 
     def __str__(self):
         return ' '.join(map(str, (self.start, self.stop, self.is_r)))
@@ -21,40 +90,80 @@ class Primer:
         return (self.start, self.stop, ("r" if self.is_r else "f"))
 
 
-def actions(primer_df, primer,tm_dict, args):  # returning possible counterparts (forward -> reverse; reverse -> forward)
-    # i.e. this method gets the "neighbors"
-    max_stop  = primer_df.index.get_level_values("stop").max()
-    if not primer.is_r:  # fwd
-        for oligo_l, primer_l in it.product(reversed(range(args.oligo_lmin, args.oligo_lmax + 1)),
-                                            range(args.primer_lmin, args.primer_lmax + 1)):
+def _delta_arrays(deltas):
+    # list of (d_start, d_stop) -> (d_start array, d_stop array)
+    arr = np.array(deltas, dtype=np.int64).reshape(-1, 2)
+    return arr[:, 0].copy(), arr[:, 1].copy()
 
-            stop = primer.start + oligo_l
-            start = stop - primer_l
 
-            if stop > max_stop:
-                continue
+class NeighborTable:
+    """
+    Successor offsets of actions(), computed once per argument set.
 
-            if args.apply_threshold:
-                # finds tm of forward and reverse primers
-                tm_f = tm_dict[primer.tup()]
-                tm_r = tm_dict[(start, stop, "r")]
+    fwd_start/fwd_stop: (start, stop) deltas of the reverse primers that can follow a
+        forward primer, relative to its start.
+    rev(frame, l): (start, stop) deltas of the forward primers that can follow a reverse
+        primer of length l with start % 3 == frame, relative to its stop. The codon-split
+        filter (primer.start - stop) >= primer.start % 3 only depends on those two values.
+    Offsets keep the order of the original it.product loops.
+    """
 
-                # if tm difference is larger then max_difference threshold do not add primer to graph
-                if abs(tm_f - tm_r) > args.max_difference:
-                    continue
+    def __init__(self, args):
+        self.args = args
+        fwd = [(oligo_l - primer_l, oligo_l)
+               for oligo_l, primer_l in it.product(reversed(range(args.oligo_lmin, args.oligo_lmax + 1)),
+                                                   range(args.primer_lmin, args.primer_lmax + 1))]
+        self.fwd_start, self.fwd_stop = _delta_arrays(fwd)
+        self._rev = {}
 
-            yield Primer(primer_df, start, stop, is_r=True)
+    def rev(self, frame, l):
+        key = (frame, l)
+        if key not in self._rev:
+            args = self.args
+            deltas = [(-overlap_l, primer_l - overlap_l)
+                      for overlap_l, primer_l in it.product(reversed(range(args.overlap_lmin, args.overlap_lmax + 1)),
+                                                            range(args.primer_lmin, args.primer_lmax + 1))
+                      # primer.start - stop = overlap_l - primer_l - l
+                      if overlap_l - primer_l - l >= frame]
+            self._rev[key] = _delta_arrays(deltas)
+        return self._rev[key]
 
-    elif primer.is_r:  # rev
-        for overlap_l, primer_l in it.product(reversed(range(args.overlap_lmin, args.overlap_lmax + 1)),
-                                              range(args.primer_lmin, args.primer_lmax + 1)):
 
-            start = primer.stop - overlap_l
-            stop = start + primer_l
+_NEIGHBOR_TABLES = {}
+
+def neighbor_table(args):
+    """NeighborTable for the length arguments in args, built once per distinct set."""
+    key = (args.oligo_lmin, args.oligo_lmax, args.overlap_lmin, args.overlap_lmax,
+           args.primer_lmin, args.primer_lmax)
+    if key not in _NEIGHBOR_TABLES:
+        _NEIGHBOR_TABLES[key] = NeighborTable(args)
+    return _NEIGHBOR_TABLES[key]
 
-            # filter
-            no_split = (primer.start - stop) >= primer.start % 3
-            if (stop > primer.start) or (not no_split):
-                continue
 
-            yield Primer(primer_df, start, stop)
+def actions(store, primer, args, table=None):  # returning possible counterparts (forward -> reverse; reverse -> forward)
+    # i.e. this method gets the "neighbors"
+    table = table or neighbor_table(args)
+    if not primer.is_r:  # fwd
+        starts = primer.start + table.fwd_start
+        stops = primer.start + table.fwd_stop
+
+        keep = stops <= store.max_stop
+
+        if args.apply_threshold:
+            # finds tm of forward and reverse primers
+            ids_r = store.lookup(starts[keep], stops[keep], True)
+            if (ids_r < 0).any():
+                i = np.flatnonzero(ids_r < 0)[0]
+                raise KeyError((int(starts[keep][i]), int(stops[keep][i]), "r"))
+
+            # if tm difference is larger then max_difference threshold do not add primer to graph
+            keep[keep] = np.abs(store.tm[primer.id] - store.tm[ids_r]) <= args.max_difference
+
+        for start, stop in zip(starts[keep].tolist(), stops[keep].tolist()):
+            yield Primer(store, start, stop, is_r=True)
+
+    elif primer.is_r:  # rev
+        d_start, d_stop = table.rev(primer.start % 3, primer.l)
+
+        for start, stop in zip((primer.stop + d_start).tolist(), (primer.stop + d_stop).tolist()):
+            yield Primer(store, start, stop)
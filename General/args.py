@@ -21,6 +21,19 @@ def get_args():
     parser.add_argument('--max_tm', type=int, default=65, help='Maximum tm')
     parser.add_argument('--max_difference', type=int, default=3, help='Maximum tm difference between forward and reverse primer')
     parser.add_argument('--merge_bins', action='store_true', help='Choose whether to merge bins (for the relaxed version)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for primer feature computation')
+    parser.add_argument('--cache_dir', type=str, default=None, help='Directory of the on-disk primer feature cache (disabled if not set)')
+    parser.add_argument('--cache_max_mb', type=float, default=1024, help='Maximum size of the primer feature cache in MB')
+    parser.add_argument('--tm_cache_size', type=int, default=100000, help='Heterodimer Tm values kept in memory per process by the cross-hybridization checks (0 disables; stored on disk too if --cache_dir is set)')
+    parser.add_argument('--graph_format', type=str, default='networkx', choices=['networkx', 'csr'], help='Primer graph representation: networkx.DiGraph or compact CSR arrays')
+    parser.add_argument('--path_engine', type=str, default='graph', choices=['graph', 'direct'], help='PD-single-LPath: longest path on the built primer graph, or direct DP over the primer table without building the graph')
+    parser.add_argument('--batch', action='store_true', help='PD-single-LPath: run every sequence in --file_path (in parallel with --workers) instead of only the first')
+    parser.add_argument('--k_best', type=int, default=1, help='PD-single-LPath: number of best primer sets to report (best first)')
+    parser.add_argument('--null_paths', type=int, default=1000, help='Comparisons: number of null paths sampled from the primer graph')
+    parser.add_argument('--null_sampler', type=str, default='exact', choices=['exact', 'batched'], help='Comparisons: distinct paths without replacement (exact) or batched NumPy walkers streamed to CSV (batched, with replacement)')
+    parser.add_argument('--seed_k', type=int, default=5, help='PD-mul-ILP: length of the complementary seed a window pair needs to be tested for cross-hybridization (0 tests every pair)')
+    parser.add_argument('--forbidden_scope', type=str, default='all', choices=['all', 'graph'], help='PD-mul-ILP: search cross-hybridizing pairs among all primer windows, or only among primers that are nodes of the primer graphs')
+    parser.add_argument('--expansion', type=str, default='pruned', choices=['pruned', 'exhaustive'], help='PD-mul-ILP: test every sub-window pair of a cross-hybridizing Lmax window pair, or shrink it only while Tm stays above the cutoff')
     parser.add_argument('--num_proteins', type=int, default=3, help='Number of variants of the same protein (for the relaxed version)')
 
     args = parser.parse_args()
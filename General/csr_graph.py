@@ -0,0 +1,247 @@
+from __future__ import annotations
+import copy
+from array import array
+import numpy as np
+
+
+def _gather(ptr, nodes):
+    """Concatenated CSR slots [ptr[u], ptr[u+1]) of nodes, in order, and the owner of each slot."""
+    starts = ptr[nodes]
+    counts = ptr[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    slots = np.arange(total) - offsets + np.repeat(starts, counts)
+    owners = np.repeat(nodes, counts)
+    return slots, owners
+
+
+def edge_arrays(G):
+    """
+    (labels, index, src, dst, weight) arrays of a networkx DiGraph, read without copying it.
+    Node IDs follow G.nodes order and edges follow G.edges order; missing weights count as 1.
+    """
+    labels = list(G.nodes)
+    index = {v: i for i, v in enumerate(labels)}
+    adj = G.adj
+    nbrs = [adj[u] for u in labels]
+    counts = np.fromiter((len(a) for a in nbrs), dtype=np.int64, count=len(labels))
+    m = int(counts.sum())
+    src = np.repeat(np.arange(len(labels), dtype=np.int64), counts)
+    dst = np.fromiter((index[v] for a in nbrs for v in a), dtype=np.int64, count=m)
+    w = np.fromiter((d.get('weight', 1) for a in nbrs for d in a.values()), dtype=np.float64, count=m)
+    return labels, index, src, dst, w
+
+
+class _NodeView:
+    """Read-only networkx-style view of the live nodes (iterable, sized, callable)."""
+
+    def __init__(self, graph):
+        self._g = graph
+
+    def __iter__(self):
+        labels = self._g.labels
+        return (labels[i] for i in np.flatnonzero(self._g.alive).tolist())
+
+    def __len__(self):
+        return int(self._g.alive.sum())
+
+    def __contains__(self, node):
+        return self._g.has_node(node)
+
+    def __call__(self):
+        return self
+
+
+class _EdgeView:
+    """Read-only networkx-style view of the live edges; edges(data=True) yields weight dicts."""
+
+    def __init__(self, graph):
+        self._g = graph
+
+    def __iter__(self):
+        return self(data=False)
+
+    def __len__(self):
+        return int(self._g.live_edges().sum())
+
+    def __call__(self, data=False):
+        g = self._g
+        labels = g.labels
+        src = g.edge_sources()
+        live = np.flatnonzero(g.live_edges())
+        dst = g.succ_idx[live].tolist()
+        src = src[live].tolist()
+        if not data:
+            return ((labels[u], labels[v]) for u, v in zip(src, dst))
+        w = g.weight[live].tolist()
+        return ((labels[u], labels[v], {'weight': x}) for u, v, x in zip(src, dst, w))
+
+
+class CSRGraph:
+    """
+    Compact primer DAG with integer node IDs.
+
+    succ_ptr/succ_idx: CSR successor lists (per-node order = networkx insertion order)
+    pred_ptr/pred_idx: CSR predecessor lists; pred_eid maps each entry to its successor slot
+    weight:            edge weights (float32 by default), aligned with succ_idx
+    alive:             node mask; remove_nodes_from() and copy() only touch this mask
+
+    Implements the part of the networkx.DiGraph API used by the solvers (nodes, edges,
+    successors, predecessors, has_node, copy, remove_nodes_from).
+    """
+
+    def __init__(self, labels, src, dst, weight, weight_dtype=np.float32):
+        self.labels = list(labels)
+        self.index = {v: i for i, v in enumerate(self.labels)}
+        n = len(self.labels)
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        weight = np.asarray(weight)
+
+        # successors grouped by source; stable so each node keeps its edge insertion order
+        order = np.argsort(src, kind='stable')
+        self.succ_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.succ_ptr[1:])
+        self.succ_idx = dst[order].astype(np.int32)
+        self.weight = weight[order].astype(weight_dtype)
+
+        porder = np.argsort(self.succ_idx, kind='stable')
+        self.pred_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.succ_idx, minlength=n), out=self.pred_ptr[1:])
+        self.pred_idx = src[order][porder].astype(np.int32)
+        self.pred_eid = porder.astype(np.int32)
+
+        self.alive = np.ones(n, dtype=bool)
+
+    # ---- conversion ----
+    @classmethod
+    def from_networkx(cls, G, weight_dtype=np.float32):
+        labels, _, src, dst, w = edge_arrays(G)
+        return cls(labels, src, dst, w, weight_dtype=weight_dtype)
+
+    def to_networkx(self):
+        import networkx as nx
+        G = nx.DiGraph()
+        G.add_nodes_from(self.nodes)
+        G.add_edges_from(self.edges(data=True))
+        return G
+
+    # ---- networkx-style API ----
+    @property
+    def nodes(self):
+        return _NodeView(self)
+
+    @property
+    def edges(self):
+        return _EdgeView(self)
+
+    def number_of_nodes(self):
+        return len(self.nodes)
+
+    def number_of_edges(self):
+        return len(self.edges)
+
+    def has_node(self, node):
+        i = self.index.get(node)
+        return i is not None and bool(self.alive[i])
+
+    def successors(self, node):
+        u = self.index[node]
+        v = self.succ_idx[self.succ_ptr[u]:self.succ_ptr[u + 1]]
+        return [self.labels[i] for i in v[self.alive[v]].tolist()]
+
+    def predecessors(self, node):
+        v = self.index[node]
+        u = self.pred_idx[self.pred_ptr[v]:self.pred_ptr[v + 1]]
+        return [self.labels[i] for i in u[self.alive[u]].tolist()]
+
+    def remove_nodes_from(self, nodes):
+        for node in nodes:
+            i = self.index.get(node)
+            if i is not None:
+                self.alive[i] = False
+
+    def copy(self):
+        # arrays are shared; only the live-node mask is per copy
+        g = copy.copy(self)
+        g.alive = self.alive.copy()
+        return g
+
+    # ---- array helpers ----
+    def edge_sources(self):
+        """Source ID of every successor slot."""
+        return np.repeat(np.arange(len(self.labels)), np.diff(self.succ_ptr))
+
+    def live_edges(self):
+        """Mask over successor slots whose two endpoints are alive."""
+        return self.alive[self.edge_sources()] & self.alive[self.succ_idx]
+
+    def successor_slots(self, nodes):
+        """(slots, owners) of the live out-edges of nodes, grouped by node in order."""
+        slots, owners = _gather(self.succ_ptr, np.asarray(nodes, dtype=np.int64))
+        keep = self.alive[self.succ_idx[slots]]
+        return slots[keep], owners[keep]
+
+    def topological_generations(self):
+        """
+        Live nodes in topological generations, ordered exactly like
+        networkx.topological_generations on a graph with the same insertion order.
+        """
+        live = self.live_edges()
+        indeg = np.bincount(self.succ_idx[live], minlength=len(self.labels))
+        gen = np.flatnonzero(self.alive & (indeg == 0))
+        while len(gen):
+            yield gen
+            slots, _ = self.successor_slots(gen)
+            kids = self.succ_idx[slots].astype(np.int64)
+            np.subtract.at(indeg, kids, 1)
+            # a child joins the next generation at its last occurrence, as in networkx
+            _, first_rev = np.unique(kids[::-1], return_index=True)
+            nxt = kids[np.sort(len(kids) - 1 - first_rev)]
+            gen = nxt[indeg[nxt] == 0]
+
+
+class CSRGraphBuilder:
+    """
+    Collects nodes/edges with the add_edge/has_node calls used by create_graph and turns
+    them into a CSRGraph without ever materializing a networkx graph. IDs and weights are
+    kept in compact stdlib arrays while building.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.labels = []
+        self.src = array('q')
+        self.dst = array('q')
+        self.w = array('d')
+
+    def _id(self, node):
+        i = self.index.get(node)
+        if i is None:
+            i = self.index[node] = len(self.labels)
+            self.labels.append(node)
+        return i
+
+    def has_node(self, node):
+        return node in self.index
+
+    def add_edge(self, u, v, weight):
+        self.src.append(self._id(u))
+        self.dst.append(self._id(v))
+        self.w.append(weight)
+
+    def build(self, weight_dtype=np.float32):
+        src = np.frombuffer(self.src, dtype=np.int64)
+        dst = np.frombuffer(self.dst, dtype=np.int64)
+        w = np.frombuffer(self.w, dtype=np.float64)
+        # a repeated add_edge keeps the first position and the last weight, as in networkx
+        pair = src * max(len(self.labels), 1) + dst
+        _, first, inverse = np.unique(pair, return_index=True, return_inverse=True)
+        last = np.zeros(len(first), dtype=np.int64)
+        np.maximum.at(last, inverse, np.arange(len(pair)))
+        order = np.argsort(first)
+        return CSRGraph(self.labels, src[first[order]], dst[first[order]], w[last[order]],
+                        weight_dtype=weight_dtype)
@@ -0,0 +1,127 @@
+import numpy as np
+from General.Primer import PrimerStore
+from General.utils import NoPathError
+
+
+def threshold_mask(store, args):
+    """Vectorized check_threshold over all IDs of the store (False for missing primers)."""
+    if not args.apply_threshold:
+        return store.valid.copy()
+    gc_min = args.min_gc / 100.0
+    gc_max = args.max_gc / 100.0
+    return (store.valid &
+            (gc_min <= store.gc) & (store.gc <= gc_max) &
+            (float(args.min_tm) <= store.tm) & (store.tm <= float(args.max_tm)))
+
+
+def longest_path_direct(primer_df, mutreg_l, args):
+    """
+    Max-efficiency primer chain s -> f -> r -> ... -> r -> d computed straight from the
+    primer feature arrays, without building the primer graph.
+
+    Applies the same rules as create_graph/actions: the first forward primer ends at or
+    before 0, consecutive primers follow the oligo/overlap/primer length ranges and the
+    codon-split filter, every primer passes check_threshold (and the forward/reverse Tm
+    difference with --apply_threshold), and the chain ends at the first reverse primer
+    starting at or after mutreg_l. Nodes are relaxed in template-position order:
+    reverse primers by stop, forward primers by start + overlap_lmax + 1, so every
+    predecessor is final before it is used.
+
+    Returns the same ['s', node, ..., 'd'] list as longest_path_dag on the graph (among
+    paths of exactly equal weight the choice may differ). Raises NoPathError if none.
+    """
+    if args.oligo_lmin - args.overlap_lmax < 2:
+        raise ValueError("direct DP needs oligo_lmin >= overlap_lmax + 2")
+
+    store = PrimerStore(primer_df)
+    ok = threshold_mask(store, args)
+    N = len(store.valid)
+
+    # V[id]: best chain weight ending at that primer; index N is a -inf sentinel for missing IDs
+    V = np.full(N + 1, -np.inf)
+    pred = np.full(N + 1, -1, dtype=np.int64)  # -1: chain starts at 's'
+    eff = np.append(store.efficiency, np.nan)
+    tm = np.append(store.tm, np.nan)
+    ok = np.append(ok, False)
+
+    def ids(starts, stops, is_r):
+        found = store.lookup(starts, stops, is_r)
+        return np.where(found < 0, N, found)
+
+    primer_ls = np.arange(args.primer_lmin, args.primer_lmax + 1)
+    oligo_ls = np.arange(args.oligo_lmin, args.oligo_lmax + 1)
+    overlap_ls = np.arange(args.overlap_lmin, args.overlap_lmax + 1)
+    C = args.overlap_lmax + 1
+
+    # r block at stop q: f predecessors start at q - oligo_l, any length
+    f_off_start = np.repeat(-oligo_ls, len(primer_ls))
+    f_off_len = np.tile(primer_ls, len(oligo_ls))
+
+    # f block at start a: r predecessors stop at a + overlap_l with length L
+    r_off_stop = np.repeat(overlap_ls, len(primer_ls))
+    r_len = np.tile(primer_ls, len(overlap_ls))
+    # codon-split filter: (r.start - f.stop) = overlap_l - L - primer_l >= r.start % 3
+    r_gap = r_off_stop[:, None] - r_len[:, None] - primer_ls[None, :]
+
+    q_lo = store.start_min
+    q_hi = max(store.max_stop, store.start_max + C)
+    for q in range(q_lo, q_hi + 1):
+
+        # ---- reverse primers ending at q ----
+        if q <= store.max_stop:
+            r_ids = ids(q - primer_ls, np.full(len(primer_ls), q), True)
+            r_ok = ok[r_ids]
+            if r_ok.any():
+                f_starts = q + f_off_start
+                f_ids = ids(f_starts, f_starts + f_off_len, False)
+                cand = V[f_ids][None, :] + eff[r_ids][:, None]
+                if args.apply_threshold:
+                    diff_ok = np.abs(tm[f_ids][None, :] - tm[r_ids][:, None]) <= args.max_difference
+                    cand = np.where(diff_ok, cand, -np.inf)
+                best = np.argmax(cand, axis=1)
+                best_val = cand[np.arange(len(r_ids)), best]
+                upd = r_ok & (best_val > -np.inf)
+                V[r_ids[upd]] = best_val[upd]
+                pred[r_ids[upd]] = f_ids[best[upd]]
+
+        # ---- forward primers starting at a = q - C ----
+        a = q - C
+        if store.start_min <= a <= store.start_max:
+            f_ids = ids(np.full(len(primer_ls), a), a + primer_ls, False)
+            f_ok = ok[f_ids]
+            if f_ok.any():
+                r_stops = a + r_off_stop
+                r_starts = r_stops - r_len
+                r_ids = ids(r_starts, r_stops, True)
+                # terminal reverse primers only lead to 'd'
+                r_live = (r_starts < mutreg_l)[:, None]
+                allowed = r_live & (r_gap >= (r_starts % 3)[:, None])
+                cand = np.where(allowed, V[r_ids][:, None] + eff[f_ids][None, :], -np.inf)
+                best = np.argmax(cand, axis=0)
+                best_val = cand[best, np.arange(len(f_ids))]
+
+                # forward primers ending before the mutreg can also start the chain ('s' edge)
+                init = f_ok & (a + primer_ls <= 0)
+                init_val = 0.0 + eff[f_ids]
+                use_init = init & ~(best_val > init_val)
+
+                val = np.where(use_init, init_val, best_val)
+                upd = f_ok & (val > -np.inf)
+                V[f_ids[upd]] = val[upd]
+                pred[f_ids[upd]] = np.where(use_init, -1, r_ids[best])[upd]
+
+    # ---- best terminal reverse primer ----
+    r_all = np.flatnonzero(ok[:N] & (np.arange(N) % 2 == 1))
+    starts = store.start_min + (r_all // 2) // store.n_len
+    terminal = r_all[(starts >= mutreg_l) & (V[r_all] > -np.inf)]
+    if len(terminal) == 0:
+        raise NoPathError("No path found from 's' to 'd' in the implicit primer graph.")
+    curr = terminal[np.argmax(V[terminal])]
+
+    path = ['d']
+    while curr != -1:
+        path.append(store.tup(curr))
+        curr = pred[curr]
+    path.append('s')
+    path.reverse()
+    return path
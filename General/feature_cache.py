@@ -0,0 +1,146 @@
+from __future__ import annotations
+import os
+import uuid
+import hashlib
+from pathlib import Path
+import numpy as np
+from General.thermo_features import THERMO_COLUMNS
+
+# One record per primer locus: 64-bit content hash of the forward window + its primer3 features
+RECORD_DTYPE = np.dtype([('key', '<u8'), ('val', '<f8', (len(THERMO_COLUMNS),))])
+
+def record_dtype(n_values: int) -> np.dtype:
+    return np.dtype([('key', '<u8'), ('val', '<f8', (n_values,))])
+
+# Merge shards into one once there are more than this many
+MAX_SHARDS = 32
+
+_CACHES = {}
+
+
+class FeatureCache:
+    """
+    On-disk, content-addressed cache of primer3 locus features (THERMO_COLUMNS).
+
+    Entries are keyed by a hash of the forward window sequence plus the thermodynamic
+    conditions and stored as sorted, memory-mappable .npy shards. Shards are evicted
+    least-recently-used first (by mtime) once the cache exceeds max_bytes.
+    n_values: number of float64 values per entry (the THERMO_COLUMNS features by default).
+    """
+
+    def __init__(self, cache_dir, conditions: tuple, max_bytes: int, n_values: int = len(THERMO_COLUMNS)):
+        self.conditions = conditions
+        self.max_bytes = max_bytes
+        self.n_values = n_values
+        self.dtype = RECORD_DTYPE if n_values == len(THERMO_COLUMNS) else record_dtype(n_values)
+        cond_digest = hashlib.blake2b(repr(conditions).encode(), digest_size=8)
+        self._hasher = cond_digest.copy()
+        # conditions are part of every key; separate directories just keep shards small
+        self.dir = Path(cache_dir) / cond_digest.hexdigest()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def keys_for(self, seqs) -> np.ndarray:
+        keys = np.empty(len(seqs), dtype=np.uint64)
+        for i, s in enumerate(seqs):
+            h = self._hasher.copy()
+            h.update(s.encode())
+            keys[i] = int.from_bytes(h.digest(), 'little')
+        return keys
+
+    def _shards(self):
+        return sorted(self.dir.glob('*.npy'))
+
+    def mapped_shards(self):
+        """[(path, memory-mapped records)] of the current shards, for callers doing many single-key lookups."""
+        out = []
+        for path in self._shards():
+            try:
+                out.append((path, np.load(path, mmap_mode='r')))
+            except (OSError, ValueError):
+                continue
+        return out
+
+    def get(self, keys: np.ndarray):
+        """Return (values, found) for keys; values of missing rows are undefined."""
+        vals = np.empty((len(keys), self.n_values), dtype=np.float64)
+        found = np.zeros(len(keys), dtype=bool)
+        for path in self._shards():
+            if found.all():
+                break
+            try:
+                shard = np.load(path, mmap_mode='r')
+            except (OSError, ValueError):  # evicted or being replaced by another process
+                continue
+            todo = np.flatnonzero(~found)
+            shard_keys = shard['key']
+            pos = np.minimum(np.searchsorted(shard_keys, keys[todo]), len(shard_keys) - 1)
+            hit = shard_keys[pos] == keys[todo]
+            if hit.any():
+                vals[todo[hit]] = shard['val'][pos[hit]]
+                found[todo[hit]] = True
+                os.utime(path)  # mark as recently used
+            del shard
+        self.hits += int(found.sum())
+        self.misses += int((~found).sum())
+        return vals, found
+
+    def put(self, keys: np.ndarray, vals: np.ndarray):
+        if len(keys) == 0:
+            return
+        keys, idx = np.unique(keys, return_index=True)
+        rec = np.empty(len(keys), dtype=self.dtype)
+        rec['key'] = keys
+        rec['val'] = vals[idx]
+        self._write(rec)
+        if len(self._shards()) > MAX_SHARDS:
+            self._compact()
+        self._evict()
+
+    def _write(self, rec):
+        # write to a temp name and rename so readers never see a partial shard
+        name = uuid.uuid4().hex
+        tmp = self.dir / f'{name}.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, rec)
+        os.replace(tmp, self.dir / f'{name}.npy')
+
+    def _compact(self):
+        shards = self._shards()
+        parts = []
+        for path in shards:
+            try:
+                parts.append(np.load(path))
+            except (OSError, ValueError):
+                continue
+        merged = np.concatenate(parts)
+        _, idx = np.unique(merged['key'], return_index=True)
+        self._write(merged[idx])
+        for path in shards:
+            path.unlink(missing_ok=True)
+
+    def _evict(self):
+        shards = []
+        for path in self.dir.glob('*.npy'):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            shards.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in shards)
+        for _, size, path in sorted(shards):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def get_feature_cache(cache_dir, conditions: tuple, max_mb: float):
+    """Return the process-wide FeatureCache for (cache_dir, conditions), or None if disabled."""
+    if not cache_dir:
+        return None
+    key = (str(cache_dir), conditions)
+    if key not in _CACHES:
+        _CACHES[key] = FeatureCache(cache_dir, conditions, int(max_mb * 2**20))
+    return _CACHES[key]
@@ -1,8 +1,10 @@
 import math
+import itertools as it
+import numpy as np
 import pandas as pd
-import primer3 as p3
-from Bio.Seq import Seq
 import General.utils as GU 
+from General.thermo_features import compute_thermo_features, THERMO_COLUMNS
+from General.feature_cache import get_feature_cache
 
 # ====== parameter sets from the paper (S-shape), excluding SNP/poly ======
  # (MinO,MaxO, Min,Max, MinL,MaxL)
@@ -102,46 +104,144 @@ def _weighted_func_from_scores(scores: dict) -> float:
     total_w = sum(WEIGHTS.values())
     return sum(WEIGHTS[k] * (scores[k]) for k in scores) / total_w
 
-def create_primer_df(sequence_nt, args, cfg):
-
-    PCR = GU.get_PCR()
-
-    # Forward primers
-    primer_f = pd.DataFrame(columns=['seq', 'start', 'stop', 'fr', 'len'])
-    primer_f[['seq','start','stop','len']] = GU.subsequences(sequence_nt, args.primer_lmin, args.primer_lmax)
-    primer_f['fr'] = 'f'
-
-    # Shift positions so 0 aligns to start of mutreg
-    primer_f['start'] = primer_f.start - len(cfg.upstream)
-    primer_f['stop']  = primer_f.stop  - len(cfg.upstream)
+# ====== columnar (NumPy) scoring engine ======
+# Same scores as the per-row functions above, computed for whole feature columns.
 
-    # Reverse primers at same loci (reverse-complement sequences)
-    primer_r = primer_f[['seq','start','stop','fr','len']].copy()
-    primer_r['fr']  = 'r'
-    primer_r['seq'] = primer_r.seq.apply(GU.revcomp)
-
-    primer_df = pd.concat([primer_f, primer_r])
-    primer_df.sort_values(by=['start','stop','fr'], inplace=True)
-
-    # ---- raw features needed for scoring ----
-    primer_df['gc'] = primer_df.seq.apply(calc_gc)
-    primer_df['tm'] = primer_df.seq.apply(PCR.calc_tm)
-
-    # hairpin & homodimer 
-    hp_res = primer_df.seq.apply(lambda s: PCR.calc_hairpin(s).todict())
-    primer_df['hp_tm'] = hp_res.apply(lambda d: d['tm'])
-
-    ho_res = primer_df.seq.apply(lambda s: PCR.calc_homodimer(s).todict())
-    primer_df['ho_tm'] = ho_res.apply(lambda d: d['tm'])
-
-    # 3' end features
-    primer_df['endA']  = primer_df.seq.apply(count_terminal_As_3prime)
+FEATURE_PARAMS = {
+    'tm':    PARAMS_TM,
+    'gc':    PARAMS_GC,
+    'self':  PARAMS_SELF,
+    'endA':  PARAMS_ENDA,
+    'enddG': PARAMS_ENDDG,
+}
 
-    # 3' end stability of last 5-nt
-    endstab_res = primer_df.seq.apply(lambda s: PCR.calc_end_stability(s[-5:], GU.revcomp(s[-5:])).todict())
-    # Primer3 returns dG in cal/mol; convert to kcal/mol like you did for hp/ho:
-    primer_df['end_dg'] = endstab_res.apply(lambda res: res['dg'] * 1e-3)
+def _sigmoid_arr(z: np.ndarray) -> np.ndarray:
+    ez = np.exp(-np.abs(z))
+    return np.where(z >= 0, 1.0 / (1.0 + ez), ez / (1.0 + ez))
+
+def _branch_arr(x: np.ndarray, O: float, L_: float, M_: float) -> np.ndarray:
+    # shared form of _left_branch / _right_branch; constants stay Python floats
+    k  = 10.0 / (O - L_)
+    x0 = (O + L_) / 2.0
+    y0 = math.exp(-k * (M_ - x0))**-1
+    L  = 1.0 + math.exp(-k * (M_ - x0))**-1
+    return L * _sigmoid_arr(k * (x - x0)) - y0
+
+def piecewise_logistic_score_arr(x, MinO: float, MaxO: float,
+                                 Min_: float, Max_: float,
+                                 MinL: float, MaxL: float) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    out = np.ones_like(x)
+    # branches are only evaluated where they apply (e.g. PARAMS_SELF has MinO == MinL)
+    left = x <= MinO
+    right = ~(x <= MaxO)
+    if left.any():
+        out[left] = _branch_arr(x[left], MinO, MinL, Min_)
+    if right.any():
+        out[right] = _branch_arr(x[right], MaxO, MaxL, Max_)
+    return out
+
+# 2-bit-style nucleotide codes used by the window helpers (4 = anything else)
+_NT_CODE = np.full(256, 4, dtype=np.uint8)
+for _i, _b in enumerate('ACGT'):
+    _NT_CODE[ord(_b)] = _i
+    _NT_CODE[ord(_b.lower())] = _i
+
+def encode_nt(sequence: str) -> np.ndarray:
+    """A/C/G/T -> 0/1/2/3 (case-insensitive), any other symbol -> 4."""
+    return _NT_CODE[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+
+def _run_lengths(mask: np.ndarray, reverse=False) -> np.ndarray:
+    # length of the run of True values ending (or, if reverse, starting) at each position
+    m = mask[::-1] if reverse else mask
+    idx = np.arange(1, len(m) + 1)
+    last_false = np.maximum.accumulate(np.where(m, 0, idx))
+    runs = idx - last_false
+    return runs[::-1] if reverse else runs
+
+def calc_gc_windows(sequence: str, starts, stops) -> np.ndarray:
+    """calc_gc for every window sequence[start:stop] via prefix sums (equal on both strands)."""
+    codes = encode_nt(sequence)
+    starts = np.asarray(starts); stops = np.asarray(stops)
+    gc_cum = np.concatenate(([0], np.cumsum((codes == 1) | (codes == 2))))
+    valid_cum = np.concatenate(([0], np.cumsum(codes < 4)))
+    gc = gc_cum[stops] - gc_cum[starts]
+    valid = valid_cum[stops] - valid_cum[starts]
+    return np.divide(gc, valid, out=np.zeros(len(gc), dtype=np.float64), where=valid > 0)
+
+def count_terminal_As_windows(sequence: str, starts, stops, is_r) -> np.ndarray:
+    """count_terminal_As_3prime for every window; reverse primers are read on the revcomp strand."""
+    codes = encode_nt(sequence)
+    starts = np.asarray(starts); stops = np.asarray(stops)
+    # forward 3' end is the window's last base; a reverse primer's trailing A's are
+    # the leading T's of the forward window
+    a_run = _run_lengths(codes == 0)
+    t_run = _run_lengths(codes == 3, reverse=True)
+    n_a = np.where(is_r, t_run[starts], a_run[stops - 1])
+    return np.minimum(n_a, stops - starts).astype(np.int64)
+
+def score_features(tm, gc, self_tm, endA, end_dg) -> np.ndarray:
+    """Per-feature scores as an (n, 5) matrix, columns ordered like WEIGHTS."""
+    features = {'tm': tm, 'gc': gc, 'self': self_tm, 'endA': endA, 'enddG': end_dg}
+    return np.column_stack([piecewise_logistic_score_arr(features[k], *FEATURE_PARAMS[k])
+                            for k in WEIGHTS])
+
+def weighted_efficiency(scores: np.ndarray) -> np.ndarray:
+    """Weighted average of the score matrix as a single matrix product."""
+    w = np.fromiter(WEIGHTS.values(), dtype=np.float64)
+    return (scores @ w) / w.sum()
+
+# ====== 3' end-stability lookup table ======
+# The end-stability feature only sees the 3'-terminal pentamer, so there are 4^5 = 1024
+# distinct values. They are filled once per set of ThermoAnalysis conditions.
+
+THERMO_CONDITIONS = ('mv_conc', 'dv_conc', 'dntp_conc', 'dna_conc', 'dmso_conc', 'dmso_fact',
+                     'formamide_conc', 'temp_c', 'max_loop', 'tm_method', 'salt_correction_method')
+
+_END_DG_TABLES = {}
+
+def thermo_key(PCR) -> tuple:
+    """Hashable snapshot of the ThermoAnalysis conditions that affect primer3 results."""
+    return tuple(getattr(PCR, a) for a in THERMO_CONDITIONS)
+
+def end_dg_table(PCR=None) -> np.ndarray:
+    """3' end-stability dG (kcal/mol) of every pentamer, indexed by its 2-bit code (read-only)."""
+    PCR = PCR or GU.get_PCR()
+    key = thermo_key(PCR)
+    table = _END_DG_TABLES.get(key)
+    if table is None:
+        table = np.empty(4**5, dtype=np.float64)
+        for code, pent in enumerate(map(''.join, it.product('ACGT', repeat=5))):
+            table[code] = PCR.calc_end_stability(pent, GU.revcomp(pent)).dg * 1e-3
+        table.flags.writeable = False
+        _END_DG_TABLES[key] = table
+    return table
+
+def end_pentamer_codes(sequence: str, starts, stops, is_r) -> np.ndarray:
+    """2-bit code of each primer's 3'-terminal pentamer; -1 if it has a non-ACGT base."""
+    codes = encode_nt(sequence).astype(np.int64)
+    starts = np.asarray(starts); stops = np.asarray(stops)
+    offs = np.arange(5)
+    # bases in 5'->3' primer order; a reverse primer ends with revcomp(window[:5])
+    fwd = codes[stops[:, None] - 5 + offs]
+    rev = 3 - codes[starts[:, None] + 4 - offs]
+    bases = np.where(np.asarray(is_r)[:, None], rev, fwd)
+    pent = bases @ (4 ** offs[::-1])
+    pent[((bases < 0) | (bases > 3)).any(axis=1)] = -1
+    return pent
+
+def add_scores(primer_df):
+    """Add score_* and efficiency columns from the raw feature columns (columnar engine)."""
+    self_tm = np.maximum(primer_df['hp_tm'].to_numpy(), primer_df['ho_tm'].to_numpy())
+    scores = score_features(primer_df['tm'].to_numpy(), primer_df['gc'].to_numpy(), self_tm,
+                            primer_df['endA'].to_numpy(), primer_df['end_dg'].to_numpy())
+    for j, k in enumerate(WEIGHTS):
+        primer_df[f'score_{k}'] = scores[:, j]
+    primer_df['efficiency'] = weighted_efficiency(scores)
+    return primer_df
 
+def add_scores_rowwise(primer_df):
+    """Reference per-row implementation of add_scores, kept for equivalence checks."""
     primer_df['score_tm']    = primer_df.tm.apply(lambda x: _score_tm(x))
     primer_df['score_gc']    = primer_df.gc.apply(lambda x: _score_gc(x))
     primer_df['score_self']  = primer_df[['hp_tm','ho_tm']].max(axis=1).apply(lambda x: _score_self(x))
@@ -160,8 +260,150 @@ def create_primer_df(sequence_nt, args, cfg):
         return _weighted_func_from_scores(scores)
 
     primer_df['efficiency'] = primer_df.apply(primer_efficiency_row, axis=1)
-    primer_df.reset_index(inplace=True)
-    primer_df.set_index(['start','stop','fr'], inplace=True)
     return primer_df
 
+def cached_thermo_features(sequence_nt, starts, stops, seqs, args, PCR=None):
+    """compute_thermo_features, reading and filling the on-disk feature cache if --cache_dir is set."""
+    PCR = PCR or GU.get_PCR()
+    cache = get_feature_cache(args.cache_dir, thermo_key(PCR), args.cache_max_mb)
+    if cache is None:
+        return compute_thermo_features(sequence_nt, starts, stops, workers=args.workers, PCR=PCR)
+
+    keys = cache.keys_for(seqs)
+    thermo, found = cache.get(keys)
+    miss = np.flatnonzero(~found)
+    if len(miss):
+        thermo[miss] = compute_thermo_features(sequence_nt, starts[miss], stops[miss],
+                                               workers=args.workers, PCR=PCR)
+        cache.put(keys[miss], thermo[miss])
+    return thermo
+
+# ====== constant-flank memo ======
+# Every full sequence is cfg.upstream + mutreg + cfg.downstream, so windows lying entirely
+# inside a flank have the same features for every protein. They are computed once per Config.
+
+_FLANK_MEMO = {}
+
+def _flank_table(flank, args, PCR):
+    # table[length - primer_lmin, start] holds the features of flank[start:start + length]
+    sub = GU.subsequences(flank, args.primer_lmin, args.primer_lmax)
+    starts = np.fromiter((r[1] for r in sub), dtype=np.int64, count=len(sub))
+    stops = np.fromiter((r[2] for r in sub), dtype=np.int64, count=len(sub))
+    n_len = args.primer_lmax - args.primer_lmin + 1
+    table = np.full((n_len, len(flank), len(THERMO_COLUMNS)), np.nan)
+    table[stops - starts - args.primer_lmin, starts] = compute_thermo_features(
+        flank, starts, stops, workers=args.workers, PCR=PCR)
+    return table
+
+def flank_thermo_features(cfg, args, PCR=None):
+    """(upstream, downstream) feature tables of all windows inside the constant flanks, memoized per Config."""
+    PCR = PCR or GU.get_PCR()
+    key = (cfg, args.primer_lmin, args.primer_lmax, thermo_key(PCR))
+    if key not in _FLANK_MEMO:
+        _FLANK_MEMO[key] = (_flank_table(cfg.upstream, args, PCR),
+                            _flank_table(cfg.downstream, args, PCR))
+    return _FLANK_MEMO[key]
+
+def locus_thermo_features(sequence_nt, starts, stops, seqs, args, cfg, PCR=None):
+    """
+    primer3 features of every locus. Windows inside the constant flanks are spliced in from
+    flank_thermo_features by offset; only windows touching the mutreg region are computed.
+    """
+    n = len(starts)
+    thermo = np.empty((n, len(THERMO_COLUMNS)), dtype=np.float64)
+    in_flank = np.zeros(n, dtype=bool)
+
+    # flanks may have been altered by the caller (e.g. case changes); only reuse exact matches
+    if sequence_nt.startswith(cfg.upstream) and sequence_nt.endswith(cfg.downstream):
+        up_table, down_table = flank_thermo_features(cfg, args, PCR)
+        lens = stops - starts - args.primer_lmin
+        down_start = len(sequence_nt) - len(cfg.downstream)
+
+        up = stops <= len(cfg.upstream)
+        down = (starts >= down_start) & ~up
+        thermo[up] = up_table[lens[up], starts[up]]
+        thermo[down] = down_table[lens[down], starts[down] - down_start]
+        in_flank = up | down
+
+    rest = np.flatnonzero(~in_flank)
+    thermo[rest] = cached_thermo_features(sequence_nt, starts[rest], stops[rest], seqs[rest], args, PCR)
+    return thermo
+
+def create_locus_df(sequence_nt, args, cfg, PCR=None):
+    """
+    One row per primer locus (start, stop) with the primer3 features of both strands.
+    GC content and Tm are identical for a window and its reverse complement, so they are
+    computed once here and shared by the 'f' and 'r' rows of create_primer_df; hairpin and
+    homodimer Tm are kept per strand (hp_tm_f/hp_tm_r, ho_tm_f/ho_tm_r).
+    """
+    locus_df = pd.DataFrame(columns=['seq', 'start', 'stop', 'len'])
+    locus_df[['seq','start','stop','len']] = GU.subsequences(sequence_nt, args.primer_lmin, args.primer_lmax)
+
+    starts = locus_df.start.to_numpy(dtype=np.int64)
+    stops = locus_df.stop.to_numpy(dtype=np.int64)
+
+    locus_df['gc'] = calc_gc_windows(sequence_nt, starts, stops)
+    thermo = locus_thermo_features(sequence_nt, starts, stops, locus_df.seq.to_numpy(), args, cfg, PCR)
+    for j, col in enumerate(THERMO_COLUMNS):
+        locus_df[col] = thermo[:, j]
+
+    # Shift positions so 0 aligns to start of mutreg
+    locus_df['start'] = locus_df.start - len(cfg.upstream)
+    locus_df['stop']  = locus_df.stop  - len(cfg.upstream)
+    return locus_df
+
+def add_strand_features(primer_df, sequence_nt, cfg, PCR=None):
+    """Add the strand-dependent raw features (hairpin, homodimer, 3' terminal A's, 3' end stability)."""
+    PCR = PCR or GU.get_PCR()
 
+    starts = primer_df.start.to_numpy(dtype=np.int64) + len(cfg.upstream)
+    stops = primer_df.stop.to_numpy(dtype=np.int64) + len(cfg.upstream)
+    is_r = (primer_df.fr == 'r').to_numpy()
+
+    # hairpin & homodimer of this row's strand (computed per strand in create_locus_df)
+    primer_df['hp_tm'] = np.where(is_r, primer_df.hp_tm_r, primer_df.hp_tm_f)
+    primer_df['ho_tm'] = np.where(is_r, primer_df.ho_tm_r, primer_df.ho_tm_f)
+    primer_df.drop(columns=['hp_tm_f', 'ho_tm_f', 'hp_tm_r', 'ho_tm_r'], inplace=True)
+
+    # 3' end features
+    primer_df['endA']  = count_terminal_As_windows(sequence_nt, starts, stops, is_r)
+
+    # 3' end stability of last 5-nt, gathered from the pentamer table (kcal/mol)
+    pent = end_pentamer_codes(sequence_nt, starts, stops, is_r)
+    end_dg = end_dg_table(PCR)[np.maximum(pent, 0)]
+    # pentamers with ambiguous bases are not in the table; ask primer3 directly
+    seqs = primer_df.seq.to_numpy()
+    for i in np.flatnonzero(pent < 0):
+        s = seqs[i]
+        end_dg[i] = PCR.calc_end_stability(s[-5:], GU.revcomp(s[-5:])).dg * 1e-3
+    primer_df['end_dg'] = end_dg
+    return primer_df
+
+def create_primer_df(sequence_nt, args, cfg):
+
+    PCR = GU.get_PCR()
+
+    # primer3 features once per locus (strand-invariant Tm shared by both strands)
+    locus_df = create_locus_df(sequence_nt, args, cfg, PCR)
+
+    # Forward primers
+    primer_f = locus_df.copy()
+    primer_f.insert(3, 'fr', 'f')
+
+    # Reverse primers at same loci (reverse-complement sequences)
+    primer_r = primer_f.copy()
+    primer_r['fr']  = 'r'
+    primer_r['seq'] = primer_r.seq.apply(GU.revcomp)
+
+    primer_df = pd.concat([primer_f, primer_r])
+    primer_df.sort_values(by=['start','stop','fr'], inplace=True)
+
+    # ---- strand-dependent raw features needed for scoring ----
+    add_strand_features(primer_df, sequence_nt, cfg, PCR)
+
+    # feature scores and final efficiency (weighted average) for all rows at once
+    add_scores(primer_df)
+
+    primer_df.reset_index(inplace=True)
+    primer_df.set_index(['start','stop','fr'], inplace=True)
+    return primer_df
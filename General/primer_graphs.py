@@ -1,59 +1,104 @@
 from General.Primer import *
 from General.primer_data import *
-import networkx as nx
+from General.csr_graph import CSRGraphBuilder
 
 
-def create_graph(primer_df, mutreg_l, args):
+def create_graph(primer_df, mutreg_l, args, builder="iterative"):
+    """
+    Build the primer DAG from 's' through alternating forward/reverse primers to 'd'.
+    builder: "iterative" (explicit stack, no recursion limit) or "recursive" (original dfs);
+    both produce the same graph in the same insertion order.
+    With args.graph_format == "csr" the edges are collected straight into a CSRGraph.
+    """
 
     # initialize graph
-    graph = nx.DiGraph()
+    if args.graph_format != "csr":
+        import networkx as nx
+    graph = CSRGraphBuilder() if args.graph_format == "csr" else nx.DiGraph()
 
-    tm_dict = primer_df['tm'].to_dict()
-    gc_dict = primer_df['gc'].to_dict()
+    # integer-indexed feature arrays and successor offsets for the inner loops
+    store = PrimerStore(primer_df)
+    table = neighbor_table(args)
 
     # all forward primers that end before mutreg and pass threshold
     primers_init = []
     for row in primer_df.reset_index().itertuples(index=False):
         if row.stop <= 0 and row.fr == "f" and check_threshold(row.tm, row.gc, args):
             try:
-                primers_init.append(Primer(primer_df, row.start, row.stop))
+                primers_init.append(Primer(store, row.start, row.stop))
             except Exception as e:
                 print(f"Failed to construct primer for ({row.start}, {row.stop}, {row.fr}): {e}")
 
 
+    expand = dfs if builder == "recursive" else dfs_iterative
+
     for primer in primers_init:
         key = primer.tup()
         graph.add_edge('s', key, weight=primer.w)
-        dfs(graph, primer, primer_df, mutreg_l, args, tm_dict, gc_dict)
+        expand(graph, primer, store, table, mutreg_l, args)
+
+    if args.graph_format == "csr":
+        graph = graph.build()
 
     return graph
 
 
-def dfs(graph, primer, primer_df, mutreg_l, args, tm_dict, gc_dict):
+def dfs(graph, primer, store, table, mutreg_l, args):
 
     key = primer.tup()
 
-    tm = tm_dict[key]
-    gc = gc_dict[key]
+    tm = store.tm[primer.id]
+    gc = store.gc[primer.id]
 
     if (primer.start >= mutreg_l) and primer.is_r and check_threshold(tm, gc, args):
 
         graph.add_edge(key, 'd', weight=0.0)
         return
 
-    for next_primer in actions(primer_df, primer,tm_dict, args):
+    for next_primer in actions(store, primer, args, table):
 
         next_key = next_primer.tup()
 
         is_new = not graph.has_node(next_key)
 
-        tm_next = tm_dict[next_key]
-        gc_next = gc_dict[next_key]
+        tm_next = store.tm[next_primer.id]
+        gc_next = store.gc[next_primer.id]
 
         if check_threshold(tm_next, gc_next, args):
             graph.add_edge(key, next_key, weight=next_primer.w)
             if is_new:
-                dfs(graph, next_primer, primer_df, mutreg_l, args, tm_dict, gc_dict)
+                dfs(graph, next_primer, store, table, mutreg_l, args)
+
+
+def dfs_iterative(graph, primer, store, table, mutreg_l, args):
+    """Explicit-stack version of dfs: visits and adds edges in exactly the same order."""
+
+    stack = []  # (node key, pending successors) of the primers currently being expanded
+
+    def enter(p):
+        key = p.tup()
+        if (p.start >= mutreg_l) and p.is_r and check_threshold(store.tm[p.id], store.gc[p.id], args):
+            graph.add_edge(key, 'd', weight=0.0)
+        else:
+            stack.append((key, actions(store, p, args, table)))
+
+    enter(primer)
+
+    while stack:
+        key, successors = stack[-1]
+        next_primer = next(successors, None)
+        if next_primer is None:
+            stack.pop()
+            continue
+
+        next_key = next_primer.tup()
+
+        is_new = not graph.has_node(next_key)
+
+        if check_threshold(store.tm[next_primer.id], store.gc[next_primer.id], args):
+            graph.add_edge(key, next_key, weight=next_primer.w)
+            if is_new:
+                enter(next_primer)
 
 
 def check_threshold(tm, gc, args):
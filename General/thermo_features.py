@@ -0,0 +1,111 @@
+from __future__ import annotations
+import atexit
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import General.utils as GU
+
+# primer3 features of one locus: Tm is strand-invariant, hairpin/homodimer are per strand
+THERMO_COLUMNS = ('tm', 'hp_tm_f', 'ho_tm_f', 'hp_tm_r', 'ho_tm_r')
+
+# Worker globals (per-process)
+_G = {}
+
+# Parent-side pool, started on first parallel call and reused by later ones
+_POOL = {"pool": None, "procs": 0}
+
+
+def _thermo_rows(text, offset, starts, stops, out, PCR):
+    """Fill out[i] with THERMO_COLUMNS for the window text[starts[i]-offset : stops[i]-offset]."""
+    for i in range(len(starts)):
+        f = text[starts[i] - offset:stops[i] - offset]
+        r = GU.revcomp(f)
+        out[i, 0] = PCR.calc_tm(f)
+        out[i, 1] = PCR.calc_hairpin(f).tm
+        out[i, 2] = PCR.calc_homodimer(f).tm
+        out[i, 3] = PCR.calc_hairpin(r).tm
+        out[i, 4] = PCR.calc_homodimer(r).tm
+
+
+def _init_worker():
+    _G["PCR"] = GU.get_PCR()
+    _G["shm"] = None
+
+
+def _attach(shm_name, n_rows):
+    # keep only the buffer of the current call attached
+    shm = _G["shm"]
+    if shm is None or shm.name != shm_name:
+        if shm is not None:
+            shm.close()
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _G["shm"] = shm
+        _G["out"] = np.ndarray((n_rows, len(THERMO_COLUMNS)), dtype=np.float64, buffer=shm.buf)
+    return _G["out"]
+
+
+def _thermo_chunk(task):
+    """Compute one shard of loci and write it straight into the shared output buffer."""
+    shm_name, n_rows, lo, text, offset, starts, stops = task
+    out = _attach(shm_name, n_rows)
+    _thermo_rows(text, offset, starts, stops, out[lo:lo + len(starts)], _G["PCR"])
+    return len(starts)
+
+
+def get_pool(workers):
+    """Return the shared spawn-context feature pool, (re)starting it if the size changed."""
+    procs = max(1, min(workers, mp.cpu_count()))
+    if _POOL["pool"] is None or _POOL["procs"] != procs:
+        shutdown_pool()
+        ctx = mp.get_context("spawn")
+        _POOL["pool"] = ctx.Pool(processes=procs, initializer=_init_worker)
+        _POOL["procs"] = procs
+    return _POOL["pool"]
+
+
+def shutdown_pool():
+    if _POOL["pool"] is not None:
+        _POOL["pool"].close()
+        _POOL["pool"].join()
+        _POOL["pool"] = None
+        _POOL["procs"] = 0
+
+atexit.register(shutdown_pool)
+
+
+def compute_thermo_features(sequence_nt, starts, stops, workers=1, PCR=None) -> np.ndarray:
+    """
+    primer3 features (THERMO_COLUMNS) for every window sequence_nt[start:stop].
+
+    With workers > 1 the windows are sharded across a process pool; each worker keeps
+    its own ThermoAnalysis instance and writes into a shared-memory array, so only the
+    shard's template slice and coordinates are sent to it.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+    n = len(starts)
+    out = np.empty((n, len(THERMO_COLUMNS)), dtype=np.float64)
+
+    if workers <= 1 or n == 0:
+        _thermo_rows(sequence_nt, 0, starts, stops, out, PCR or GU.get_PCR())
+        return out
+
+    pool = get_pool(workers)
+    chunk = max(1, n // (_POOL["procs"] * 4))
+
+    shm = shared_memory.SharedMemory(create=True, size=out.nbytes)
+    try:
+        shared = np.ndarray(out.shape, dtype=out.dtype, buffer=shm.buf)
+        tasks = []
+        for lo in range(0, n, chunk):
+            s, e = starts[lo:lo + chunk], stops[lo:lo + chunk]
+            a, b = int(s.min()), int(e.max())
+            tasks.append((shm.name, n, lo, sequence_nt[a:b], a, s, e))
+        for _ in pool.imap_unordered(_thermo_chunk, tasks):
+            pass
+        out[:] = shared
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from array import array
+from functools import lru_cache
+from pathlib import Path
+import os
+import numpy as np
+import General.utils as GU
+from General.feature_cache import FeatureCache
+from General.primer_data import thermo_key
+
+_CACHES = {}
+
+
+class HeterodimerCache:
+    """
+    Bounded memo of primer3 heterodimer Tm values, shared by the cross-hybridization checks.
+
+    Entries are keyed by the ordered pair (seq1, seq2), uppercased: primer3's heterodimer Tm
+    depends on the argument order, so (a, b) and (b, a) are separate entries. One instance
+    serves one set of thermodynamic conditions. Two tiers:
+      - an in-process LRU of max_entries pairs (0 disables it);
+      - with cache_dir, an on-disk FeatureCache under cache_dir/heterodimer. Its shards are
+        memory-mapped by open_disk() and new values are buffered until flush(), so a process
+        that only reads (a pool worker) can hand them to a single writer with drain()/merge().
+    hits, disk_hits and misses count lookups answered by the LRU, the disk tier and primer3.
+    """
+
+    def __init__(self, PCR, max_entries: int, cache_dir=None, max_bytes: int = 0):
+        self.PCR = PCR
+        self.max_entries = max_entries
+        self.disk = None
+        if cache_dir:
+            self.disk = FeatureCache(Path(cache_dir) / "heterodimer", thermo_key(PCR), max_bytes, n_values=1)
+        self._mapped = []
+        self._touched = set()
+        self._new_keys = array('Q')
+        self._new_tms = array('d')
+        self.lookups = self.disk_hits = self.misses = 0
+        self._lookup = lru_cache(maxsize=max_entries)(self._compute) if max_entries > 0 else self._compute
+
+    @property
+    def hits(self) -> int:
+        return self.lookups - self.disk_hits - self.misses
+
+    def tm(self, seq1: str, seq2: str) -> float:
+        """Heterodimer Tm of seq1 with seq2, as PCR.calc_heterodimer(seq1, seq2).tm."""
+        self.lookups += 1
+        return self._lookup(seq1.upper(), seq2.upper())
+
+    def _compute(self, seq1, seq2):
+        key = None
+        if self.disk is not None:
+            key = int(self.disk.keys_for((f"{seq1},{seq2}",))[0])
+            tm = self._disk_get(key)
+            if tm is not None:
+                self.disk_hits += 1
+                return tm
+        self.misses += 1
+        tm = self.PCR.calc_heterodimer(seq1, seq2).tm
+        if key is not None:
+            self._new_keys.append(key)
+            self._new_tms.append(tm)
+        return tm
+
+    def _disk_get(self, key):
+        for path, keys, tms in self._mapped:
+            pos = int(np.searchsorted(keys, key))
+            if pos < len(keys) and keys[pos] == key:
+                if path not in self._touched:
+                    self._touched.add(path)
+                    try:
+                        os.utime(path)  # mark as recently used
+                    except FileNotFoundError:
+                        pass
+                return float(tms[pos])
+        return None
+
+    def open_disk(self):
+        """(Re)map the on-disk shards, e.g. at the start of a search, to see entries written since."""
+        if self.disk is None:
+            return
+        self._mapped = [(path, rec['key'], rec['val'][:, 0]) for path, rec in self.disk.mapped_shards()]
+        self._touched = set()
+
+    def drain(self):
+        """(keys, tms) of the values computed since the last drain/flush, removed from the buffer."""
+        keys = np.frombuffer(self._new_keys, dtype=np.uint64).copy()
+        tms = np.frombuffer(self._new_tms, dtype=np.float64).copy()
+        self._new_keys = array('Q')
+        self._new_tms = array('d')
+        return keys, tms
+
+    def merge(self, keys, tms):
+        """Buffer values drained from another process for the next flush."""
+        self._new_keys.extend(np.asarray(keys, dtype=np.uint64).tolist())
+        self._new_tms.extend(np.asarray(tms, dtype=np.float64).tolist())
+
+    def flush(self):
+        """Write the buffered values to the disk tier (one shard) and remap it."""
+        if self.disk is None:
+            return
+        keys, tms = self.drain()
+        if len(keys):
+            self.disk.put(keys, tms[:, None])
+        self.open_disk()
+
+    def take_stats(self):
+        """(hits, disk_hits, misses) since the last call."""
+        stats = (self.hits, self.disk_hits, self.misses)
+        self.lookups = self.disk_hits = self.misses = 0
+        return stats
+
+
+def format_stats(hits, disk_hits, misses) -> str:
+    total = hits + disk_hits + misses
+    saved = (hits + disk_hits) / total * 100 if total else 0.0
+    return (f"{total} heterodimer Tm lookups, {hits} memory hits, {disk_hits} disk hits, "
+            f"{misses} primer3 calls ({saved:.1f}% saved)")
+
+
+def get_tm_cache(max_entries: int, cache_dir=None, max_mb: float = 0, PCR=None):
+    """Return the process-wide HeterodimerCache for these settings and the conditions of PCR."""
+    PCR = PCR or GU.get_PCR()
+    key = (max_entries, str(cache_dir) if cache_dir else None, max_mb, thermo_key(PCR))
+    if key not in _CACHES:
+        _CACHES[key] = HeterodimerCache(PCR, max_entries, cache_dir, int(max_mb * 2**20))
+        _CACHES[key].open_disk()
+    return _CACHES[key]
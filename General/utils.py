@@ -1,12 +1,13 @@
 import json
-import gurobipy as gp
 import pandas as pd
 import primer3 as p3
-from Bio.Seq import Seq
-import networkx as nx
 import random 
-from Bio import SeqIO
+import bisect
+import heapq
+import itertools as it
 from dataclasses import dataclass
+import numpy as np
+from General.csr_graph import CSRGraph, edge_arrays, _gather
 
 @dataclass(frozen=True)
 class Config:
@@ -37,12 +38,15 @@ def calc_tm(seq1, seq2):
     return get_PCR().calc_heterodimer(seq1, seq2).tm
 
 def read_fasta(fasta_path):
+    from Bio import SeqIO
 
     with open(fasta_path, "r") as handle:
         record = next(SeqIO.parse(handle, "fasta"))
         return str(record.seq)
     
 def get_model(file_path='gurobi.json'):
+    # gurobipy is only needed by the ILP versions; imported here so other modes do not load it
+    import gurobipy as gp
 
     with open(file_path, 'r') as json_file:
         params = json.load(json_file)
@@ -76,8 +80,17 @@ def read_sequences(file_path, cfg):
 
     return mutreg_regions,full_sequences,protein_names
 
+# IUPAC complement table (case-preserving, U -> A, other symbols unchanged), as Bio.Seq
+_COMPLEMENT = str.maketrans("ACGTUMRWSYKVHDBNacgtumrwsykvhdbn", "TGCAAKYWSRMBDHVNtgcaakywsrmbdhvn")
+
 def revcomp(seq):
-    return str(Seq(seq).reverse_complement())
+    """
+    Reverse complement of a nucleotide string, or of a 2-bit code array
+    (A/C/G/T = 0/1/2/3 as in primer_data.encode_nt; codes > 3 are kept as is).
+    """
+    if isinstance(seq, np.ndarray):
+        return np.where(seq < 4, 3 - seq, seq)[::-1]
+    return seq.translate(_COMPLEMENT)[::-1]
 
 def subsequences(sequence,primer_lmin,primer_lmax): #Generates all subsequences w/ all poss. start-stop pairs
   ls = []
@@ -93,38 +106,49 @@ class NoPathError(Exception):
     """Raised when no path exists between source and target in the DAG."""
     pass
 
-def longest_path_dag(G, source, target): 
+def longest_path_dag(G, source, target, order="position"):
     """
     Finds the maximum-weight path between source and target in a DAG.
     Raises NoPathError if no path exists.
+
+    order="position" runs the DP over the primer graph's genomic position order (no copy,
+    no topological sort) and falls back to a topological order for graphs that are not
+    ordered by position; order="topological" always relaxes in networkx topological order.
+    Both return a maximum-weight path; among paths of exactly equal weight they may differ.
     """
-    # Step 1: Negate weights to convert max → min
-    G_neg = G.copy()
-    for u, v, data in G_neg.edges(data=True):
-        data['weight'] = -data.get('weight', 1)
-    
-    # Step 2: Topological order
-    topo_order = list(nx.topological_sort(G_neg))
+    if isinstance(G, CSRGraph):
+        return _longest_path_csr(G, source, target)
+
+    if order == "position":
+        path = _longest_path_positional(G, source, target)
+        if path is not None:
+            return path
+
+    return _longest_path_topological(G, source, target)
+
+def _longest_path_topological(G, source, target):
+    import networkx as nx
+    # Relax edges in topological order (weights are negated on the fly: max → min)
+    topo_order = list(nx.topological_sort(G))
     
-    # Step 3: Initialize distances and parent pointers
-    dist = {v: float('inf') for v in G_neg.nodes()}
+    # Initialize distances and parent pointers
+    dist = {v: float('inf') for v in G.nodes()}
     dist[source] = 0
-    parent = {v: None for v in G_neg.nodes()}
+    parent = {v: None for v in G.nodes()}
     
-    # Step 4: Relax edges in topological order
     for u in topo_order:
         if dist[u] != float('inf'):
-            for v in G_neg.successors(u):
-                w = G_neg[u][v]['weight']
+            for v, data in G[u].items():
+                w = -data.get('weight', 1)
                 if dist[v] > dist[u] + w:
                     dist[v] = dist[u] + w
                     parent[v] = u
     
-    # Step 5: Raise error if target not reachable
-    if dist[target] == float('inf'):
+    # Raise error if target not reachable
+    if dist.get(target, float('inf')) == float('inf'):
         raise NoPathError(f"No path found from {source!r} to {target!r} in the DAG.")
     
-    # Step 6: Reconstruct path
+    # Reconstruct path
     path = []
     curr = target
     while curr is not None:
@@ -134,7 +158,546 @@ def longest_path_dag(G, source, target):
     
     return path
 
-def sample_paths_dag_uniform(G, source, target, k=100, max_tries=10000, seed=42, verbose = False):
+def position_buckets(labels, src, dst, source, target):
+    """
+    Bucket index of every node such that each edge goes to a strictly later bucket, or None.
+
+    Primer nodes are (start, stop, fr). Every edge moves forward along the template when a
+    forward primer is keyed by start + C and a reverse primer by stop, for any C between the
+    largest r->f and the smallest f->r span (r.stop - f.start). Nodes whose keys differ by less
+    than the minimum edge span can never be joined by an edge and share a bucket.
+    """
+    n = len(labels)
+    start = np.zeros(n)
+    stop = np.zeros(n)
+    is_r = np.zeros(n, dtype=bool)
+    for i, node in enumerate(labels):
+        if node == source or node == target:
+            continue
+        if not (isinstance(node, tuple) and len(node) == 3):
+            return None
+        start[i], stop[i], is_r[i] = node[0], node[1], node[2] == 'r'
+
+    is_s = np.array([node == source for node in labels], dtype=bool)
+    is_d = np.array([node == target for node in labels], dtype=bool)
+    primer = ~(is_s | is_d)
+
+    inner = primer[src] & primer[dst]
+    fr = inner & ~is_r[src] & is_r[dst]
+    rf = inner & is_r[src] & ~is_r[dst]
+    if (inner & ~(fr | rf)).any():
+        return None
+    span_fr = stop[dst[fr]] - start[src[fr]]
+    span_rf = stop[src[rf]] - start[dst[rf]]
+    hi = span_fr.min() if len(span_fr) else None
+    lo = span_rf.max() if len(span_rf) else None
+    if hi is None and lo is None:
+        hi, lo = 1.0, -1.0
+    hi = lo + 2.0 if hi is None else hi
+    lo = hi - 2.0 if lo is None else lo
+    if not lo < hi:
+        return None
+
+    C = (lo + hi) / 2.0
+    gap = (hi - lo) / 2.0
+    key = np.where(is_r, stop, start + C)
+    kmin = key[primer].min() if primer.any() else 0.0
+    bucket = np.floor((key - kmin) / gap).astype(np.int64) + 1
+    bucket[is_s] = 0
+    bucket[is_d] = (bucket[primer].max() + 1) if primer.any() else 1
+
+    if not (bucket[src] < bucket[dst]).all():
+        return None
+    return bucket
+
+def _longest_path_positional(G, source, target):
+    """Max-weight path DP over position buckets of a primer graph; None if G has no such order."""
+    labels, index, src, dst, w = edge_arrays(G)
+
+    bucket = position_buckets(labels, src, dst, source, target)
+    if bucket is None:
+        return None
+
+    dist = np.full(len(labels), -np.inf)
+    parent = np.full(len(labels), -1, dtype=np.int64)
+    if source in index:
+        dist[index[source]] = 0.0
+
+    # all in-edges of a bucket come from earlier (already final) buckets: relax them at once
+    edge_order = np.argsort(bucket[dst], kind='stable')
+    edge_bucket = bucket[dst][edge_order]
+    for grp in np.split(edge_order, np.flatnonzero(np.diff(edge_bucket)) + 1):
+        if len(grp) == 0:
+            continue
+        u, v = src[grp], dst[grp]
+        cand = dist[u] + w[grp]
+        # best in-edge per node; ties go to the first inserted edge
+        order = np.lexsort((grp, -cand, v))
+        v_sorted = v[order]
+        best = order[np.r_[True, v_sorted[1:] != v_sorted[:-1]]]
+        reached = cand[best] > -np.inf
+        dist[v[best][reached]] = cand[best][reached]
+        parent[v[best][reached]] = u[best][reached]
+
+    t = index.get(target)
+    if t is None or dist[t] == -np.inf:
+        raise NoPathError(f"No path found from {source!r} to {target!r} in the DAG.")
+
+    path = []
+    curr = t
+    while curr != -1:
+        path.append(labels[curr])
+        curr = parent[curr]
+    path.reverse()
+
+    return path
+
+def _longest_path_csr(G, source, target):
+    """longest_path_dag on a CSRGraph: same relaxation order, one array pass per topological generation."""
+    n = len(G.labels)
+    dist = np.full(n, -np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+    if G.has_node(source):
+        dist[G.index[source]] = 0.0
+
+    for gen in G.topological_generations():
+        slots, owners = G.successor_slots(gen)
+        if len(slots) == 0:
+            continue
+        v = G.succ_idx[slots]
+        cand = dist[owners] + G.weight[slots]
+        # best candidate per child; ties go to the first edge in relaxation order
+        order = np.lexsort((np.arange(len(v)), -cand, v))
+        v_sorted = v[order]
+        best = order[np.r_[True, v_sorted[1:] != v_sorted[:-1]]]
+        bv = v[best]
+        improved = cand[best] > dist[bv]
+        dist[bv[improved]] = cand[best][improved]
+        parent[bv[improved]] = owners[best][improved]
+
+    t = G.index.get(target)
+    if t is None or not G.alive[t] or dist[t] == -np.inf:
+        raise NoPathError(f"No path found from {source!r} to {target!r} in the DAG.")
+
+    path = []
+    curr = t
+    while curr != -1:
+        path.append(G.labels[curr])
+        curr = parent[curr]
+    path.reverse()
+
+    return path
+
+class IncrementalLongestPath:
+    """
+    Max-weight source->target path of a DAG that is kept up to date under node removals.
+
+    Keeps the forward DP (best source->v weight, parent pointer) and the backward DP
+    (best v->target weight, next pointer) of every node. Removing nodes only re-solves the
+    nodes whose parent chain (forward) or next chain (backward) ran through a removed node;
+    all other values are still optimal. Affected nodes are relaxed level by level, with the
+    same tie-breaking as longest_path_dag (first inserted edge), so path() returns the same
+    path as longest_path_dag on the graph with the nodes removed.
+
+    The graph itself is not modified; works on networkx graphs and CSRGraph.
+    """
+
+    def __init__(self, G, source, target):
+        if isinstance(G, CSRGraph):
+            labels, index = G.labels, G.index
+            src, dst = G.edge_sources(), G.succ_idx.astype(np.int64)
+            w = G.weight.astype(np.float64)
+            alive = G.alive.copy()
+        else:
+            labels, index, src, dst, w = edge_arrays(G)
+            alive = np.ones(len(labels), dtype=bool)
+        n = len(labels)
+        self.labels, self.index = labels, index
+        self.src, self.dst, self.w = src, dst, w
+        self.alive = alive
+        self.source, self.target = index.get(source), index.get(target)
+        self._names = (source, target)
+
+        # level: every edge goes to a strictly higher level
+        level = position_buckets(labels, src, dst, source, target)
+        if level is None:
+            level = np.zeros(n, dtype=np.int64)
+            for i, gen in enumerate(CSRGraph(labels, src, dst, w).topological_generations()):
+                level[gen] = i
+        self.level = level
+
+        # in-edges / out-edges of every node, each in edge insertion order
+        self.in_order = np.argsort(dst, kind='stable')
+        self.in_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=self.in_ptr[1:])
+        self.out_order = np.argsort(src, kind='stable')
+        self.out_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.out_ptr[1:])
+
+        self.fwd = np.full(n, -np.inf)
+        self.parent = np.full(n, -1, dtype=np.int64)
+        self.bwd = np.full(n, -np.inf)
+        self.next = np.full(n, -1, dtype=np.int64)
+
+        everything = np.flatnonzero(alive)
+        self._solve_forward(everything)
+        self._solve_backward(everything)
+
+    def _groups(self, nodes, reverse=False):
+        # nodes split by level, in increasing (or decreasing) level order
+        nodes = nodes[np.argsort(self.level[nodes], kind='stable')]
+        if reverse:
+            nodes = nodes[::-1]
+        return np.split(nodes, np.flatnonzero(np.diff(self.level[nodes])) + 1)
+
+    def _solve_forward(self, nodes):
+        s = self.source
+        for grp in self._groups(nodes):
+            if len(grp) == 0:
+                continue
+            self.fwd[grp] = -np.inf
+            self.parent[grp] = -1
+            slots, owners = _gather(self.in_ptr, grp)
+            e = self.in_order[slots]
+            u = self.src[e]
+            keep = self.alive[u]
+            e, u, owners = e[keep], u[keep], owners[keep]
+            cand = self.fwd[u] + self.w[e]
+            # best in-edge per node; ties go to the first inserted edge
+            order = np.lexsort((e, -cand, owners))
+            o = owners[order]
+            best = order[np.r_[True, o[1:] != o[:-1]]] if len(o) else order
+            reached = cand[best] > -np.inf
+            self.fwd[owners[best][reached]] = cand[best][reached]
+            self.parent[owners[best][reached]] = u[best][reached]
+            if s is not None and self.alive[s]:
+                self.fwd[grp[grp == s]] = 0.0
+
+    def _solve_backward(self, nodes):
+        t = self.target
+        for grp in self._groups(nodes, reverse=True):
+            if len(grp) == 0:
+                continue
+            self.bwd[grp] = -np.inf
+            self.next[grp] = -1
+            slots, owners = _gather(self.out_ptr, grp)
+            e = self.out_order[slots]
+            v = self.dst[e]
+            keep = self.alive[v]
+            e, v, owners = e[keep], v[keep], owners[keep]
+            cand = self.w[e] + self.bwd[v]
+            order = np.lexsort((e, -cand, owners))
+            o = owners[order]
+            best = order[np.r_[True, o[1:] != o[:-1]]] if len(o) else order
+            reached = cand[best] > -np.inf
+            self.bwd[owners[best][reached]] = cand[best][reached]
+            self.next[owners[best][reached]] = v[best][reached]
+            if t is not None and self.alive[t]:
+                self.bwd[grp[grp == t]] = 0.0
+
+    @staticmethod
+    def _tree_closure(pointer, hit):
+        # nodes whose pointer chain reaches a node of hit (including hit itself)
+        n = len(pointer)
+        ptr = np.where(pointer < 0, n, pointer)
+        hit = np.append(hit, False)
+        while True:
+            grown = hit[:-1] | hit[ptr]
+            if (grown == hit[:-1]).all():
+                return np.flatnonzero(grown)
+            hit[:-1] = grown
+
+    def remove_nodes_from(self, nodes):
+        ids = [self.index[v] for v in nodes if v in self.index]
+        ids = np.array([i for i in ids if self.alive[i]], dtype=np.int64)
+        if len(ids) == 0:
+            return
+        removed = np.zeros(len(self.labels), dtype=bool)
+        removed[ids] = True
+        self.alive[ids] = False
+        self.fwd[ids] = -np.inf
+        self.bwd[ids] = -np.inf
+        self.parent[ids] = -1
+        self.next[ids] = -1
+
+        f_aff = self._tree_closure(self.parent, removed)
+        b_aff = self._tree_closure(self.next, removed)
+        self._solve_forward(f_aff[self.alive[f_aff]])
+        self._solve_backward(b_aff[self.alive[b_aff]])
+
+    def weight(self):
+        """Weight of the current best path (-inf if there is none)."""
+        t = self.target
+        return -np.inf if t is None or not self.alive[t] else float(self.fwd[t])
+
+    def through(self, node):
+        """Weight of the best source->target path through node (-inf if there is none)."""
+        i = self.index[node]
+        return float(self.fwd[i] + self.bwd[i]) if self.alive[i] else -np.inf
+
+    def path(self):
+        """Current max-weight path as a list of node labels; raises NoPathError if none."""
+        if self.weight() == -np.inf:
+            source, target = self._names
+            raise NoPathError(f"No path found from {source!r} to {target!r} in the DAG.")
+        path = []
+        curr = self.target
+        while curr != -1:
+            path.append(self.labels[curr])
+            curr = self.parent[curr]
+        path.reverse()
+        return path
+
+def k_longest_paths_dag(G, source, target, k):
+    """
+    Up to k max-weight source->target paths of a DAG, best first (recursive enumeration
+    algorithm of Jimenez & Marzal, run with an explicit stack).
+
+    The first path is the longest_path_dag path. Every node v keeps the list of its best
+    source->v paths found so far, each stored as (weight, predecessor, predecessor's path
+    index, edge), and a heap of candidate next paths over its in-edges, built only when v's
+    second path is first needed. The (i+1)-th path of v is the best candidate after adding
+    the next path of the predecessor of its i-th path, so each extra path only touches the
+    nodes along it: about O(E + k * L * log(deg)) for paths of L nodes.
+    """
+    lp = IncrementalLongestPath(G, source, target)
+    s, t = lp.source, lp.target
+    if t is None or lp.weight() == -np.inf:
+        raise NoPathError(f"No path found from {source!r} to {target!r} in the DAG.")
+    fwd, src, w, alive = lp.fwd, lp.src, lp.w, lp.alive
+
+    # paths[v][i] = (weight, pred node, pred path index, in-edge id); paths[v][0] follows parent
+    paths = {}
+    heaps = {}
+    exhausted = set()  # nodes known to have no further paths
+
+    def paths_of(v):
+        if v not in paths:
+            u = int(lp.parent[v])
+            if u < 0:  # source
+                paths[v] = [(0.0, -1, -1, -1)]
+            else:
+                e_in = lp.in_order[lp.in_ptr[v]:lp.in_ptr[v + 1]]
+                e = int(e_in[src[e_in] == u][0])
+                paths[v] = [(float(fwd[v]), u, 0, e)]
+        return paths[v]
+
+    def init_heap(v):
+        # one candidate per in-edge: best path of the predecessor + edge, except paths[v][0]
+        first_edge = paths_of(v)[0][3]
+        e_in = lp.in_order[lp.in_ptr[v]:lp.in_ptr[v + 1]]
+        u_in = src[e_in]
+        keep = alive[u_in] & (fwd[u_in] > -np.inf) & (e_in != first_edge)
+        heap = [(-(float(fwd[u]) + float(w[e])), e, u, 0)
+                for u, e in zip(u_in[keep].tolist(), e_in[keep].tolist())]
+        heapq.heapify(heap)
+        heaps[v] = heap
+
+    def extend(v):
+        """Append the next best path of v to paths[v], if there is one."""
+        # frames (node, stage); stage 1 resumes after the predecessor's next path is known
+        stack = [(v, 0)]
+        while stack:
+            x, stage = stack.pop()
+            px = paths_of(x)
+            if x == s:
+                exhausted.add(x)
+                continue
+            if x not in heaps:
+                init_heap(x)
+            _, u, j, e = px[-1]
+            pu = paths_of(u)
+            if stage == 0 and len(pu) == j + 1 and u not in exhausted:
+                stack.append((x, 1))
+                stack.append((u, 0))
+                continue
+            # the predecessor's next path replaces the popped one as a candidate
+            if len(pu) > j + 1:
+                heapq.heappush(heaps[x], (-(pu[j + 1][0] + float(w[e])), e, u, j + 1))
+            if heaps[x]:
+                neg, e, u, j = heapq.heappop(heaps[x])
+                px.append((-neg, u, j, e))
+            else:
+                exhausted.add(x)
+
+    result = []
+    pt = paths_of(t)
+    for i in range(k):
+        if len(pt) <= i:
+            if t in exhausted:
+                break
+            extend(t)
+            if len(pt) <= i:
+                break
+        # walk back along (pred, pred path index)
+        nodes = [t]
+        x, idx = t, i
+        while True:
+            _, u, j, _ = paths_of(x)[idx]
+            if u < 0:
+                break
+            nodes.append(u)
+            x, idx = u, j
+        nodes.reverse()
+        result.append([lp.labels[n] for n in nodes])
+    return result
+
+def _path_counts(G, t):
+    """Number of paths from every node of a CSRGraph to node ID t (exact Python integers)."""
+    ways = np.zeros(len(G.labels), dtype=object)
+    ways[t] = 1
+    row = np.zeros(len(G.labels), dtype=np.int64)  # position of a node within its generation
+    for gen in reversed(list(G.topological_generations())):
+        gen = gen[gen != t]
+        row[gen] = np.arange(len(gen))
+        slots, owners = G.successor_slots(gen)
+        acc = np.zeros(len(gen), dtype=object)
+        np.add.at(acc, row[owners], ways[G.succ_idx[slots]])
+        ways[gen] = acc
+    return ways
+
+def _log_path_counts(G, t):
+    """Natural log of the number of paths from every node of a CSRGraph to node ID t (-inf if none)."""
+    logw = np.full(len(G.labels), -np.inf)
+    logw[t] = 0.0
+    row = np.zeros(len(G.labels), dtype=np.int64)
+    for gen in reversed(list(G.topological_generations())):
+        gen = gen[gen != t]
+        row[gen] = np.arange(len(gen))
+        slots, owners = G.successor_slots(gen)
+        vals = logw[G.succ_idx[slots]]
+        # logsumexp over the successors of each node
+        top = np.full(len(gen), -np.inf)
+        np.maximum.at(top, row[owners], vals)
+        shift = top[row[owners]]
+        terms = np.where(vals > -np.inf, np.exp(vals - np.where(shift > -np.inf, shift, 0.0)), 0.0)
+        acc = np.zeros(len(gen))
+        np.add.at(acc, row[owners], terms)
+        with np.errstate(divide='ignore'):
+            logw[gen] = np.where(top > -np.inf, top + np.log(acc), -np.inf)
+    return logw
+
+def _sample_paths_log(G, source, target, k, max_tries, seed, verbose):
+    """sample_paths_dag_uniform with log-space path counts (float64, no big integers)."""
+    rng = random.Random(seed)
+    s, t = G.index[source], G.index[target]
+
+    logw = _log_path_counts(G, t)
+    if logw[s] == -np.inf:
+        raise ValueError(f"source {source!r} cannot reach target {target!r}")
+
+    candidates = {}  # node -> (successors, cumulative probabilities) with paths to target
+
+    def successors_of(u):
+        if u not in candidates:
+            slots, _ = G.successor_slots([u])
+            vs = G.succ_idx[slots]
+            vs = vs[logw[vs] > -np.inf]
+            # probabilities relative to u's own count, so they sum to ~1 whatever the magnitude
+            candidates[u] = (vs.tolist(), np.cumsum(np.exp(logw[vs] - logw[u])).tolist())
+        return candidates[u]
+
+    paths, seen = [], set()
+    tries = 0
+
+    while len(paths) < k and tries < max_tries:
+        if verbose and tries % 100 == 0:
+            print("Number of paths found:", len(paths), "tries:", tries, end="\r")
+
+        tries += 1
+        curr = s
+        path = [curr]
+
+        while curr != t:
+            vs, cum = successors_of(curr)
+            if not vs:
+                break
+            r = rng.random() * cum[-1]
+            curr = vs[min(bisect.bisect_right(cum, r), len(vs) - 1)]
+            path.append(curr)
+
+        if path[-1] == t:
+            tup = tuple(path)
+            if tup not in seen:
+                seen.add(tup)
+                paths.append([G.labels[i] for i in path])
+
+    return paths
+
+def _sample_paths_csr(G, source, target, k, max_tries, seed, verbose):
+    """sample_paths_dag_uniform on a CSRGraph; draws the same paths for the same seed."""
+    rng = random.Random(seed)
+    s, t = G.index[source], G.index[target]
+
+    # DP: number of paths from node -> target (exact integers)
+    ways = _path_counts(G, t)
+
+    if ways[s] == 0:
+        raise ValueError(f"source {source!r} cannot reach target {target!r}")
+
+    candidates = {}  # node -> (successors, ways) with ways > 0, in insertion order
+
+    def successors_of(u):
+        if u not in candidates:
+            slots, _ = G.successor_slots([u])
+            vs = [v for v in G.succ_idx[slots].tolist() if ways[v] > 0]
+            candidates[u] = (vs, [ways[v] for v in vs])
+        return candidates[u]
+
+    paths, seen = [], set()
+    tries = 0
+
+    while len(paths) < k and tries < max_tries:
+        if verbose and tries % 100 == 0:
+            print("Number of paths found:", len(paths), "tries:", tries, end="\r")
+
+        tries += 1
+        curr = s
+        path = [curr]
+
+        while curr != t:
+            vs, ws = successors_of(curr)
+            if not vs:
+                break
+            # weighted random choice
+            total = sum(ws)
+            r = rng.uniform(0, total)
+            acc = 0.0
+            nxt = None
+            for v, w in zip(vs, ws):
+                acc += w
+                if r <= acc:
+                    nxt = v
+                    break
+            curr = nxt
+            path.append(curr)
+
+        if path[-1] == t:
+            tup = tuple(path)
+            if tup not in seen:
+                seen.add(tup)
+                paths.append([G.labels[i] for i in path])
+
+    return paths
+
+def sample_paths_dag_uniform(G, source, target, k=100, max_tries=10000, seed=42, verbose = False,
+                             counting="exact"):
+    """
+    Random walks from source to target, each step weighted by the number of paths to target
+    (uniform over paths); duplicates are dropped, so up to k distinct paths are returned.
+
+    counting="exact" counts paths with Python integers. counting="log" keeps log path counts
+    in float64 and samples with probabilities relative to the current node, which avoids
+    big-integer arithmetic when the number of paths explodes on long templates.
+    """
+    if counting == "log":
+        G = G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)
+        return _sample_paths_log(G, source, target, k, max_tries, seed, verbose)
+
+    if isinstance(G, CSRGraph):
+        return _sample_paths_csr(G, source, target, k, max_tries, seed, verbose)
+
+    import networkx as nx
     rng = random.Random(seed)
 
     topo = list(nx.topological_sort(G))
@@ -188,4 +751,202 @@ def sample_paths_dag_uniform(G, source, target, k=100, max_tries=10000, seed=42,
                 seen.add(t)
                 paths.append(path)
 
-    return paths 
\ No newline at end of file
+    return paths 
+
+def sample_distinct_ranks(total, k, rng):
+    """k distinct integers drawn uniformly from range(total) (all of them if k >= total), in random order."""
+    if k >= total:
+        ranks = list(range(total))
+    else:
+        # Floyd's algorithm: exactly k draws, no rejection, works for arbitrarily large totals
+        chosen = set()
+        for j in range(total - k, total):
+            r = rng.randrange(j + 1)
+            chosen.add(j if r in chosen else r)
+        ranks = sorted(chosen)
+    rng.shuffle(ranks)
+    return ranks
+
+def sample_paths_dag_exact(G, source, target, k=100, seed=42):
+    """
+    Exactly min(k, #paths) distinct source->target paths, drawn uniformly without replacement.
+
+    Counts the paths from every node to target, draws k distinct ranks from
+    range(#paths) and unranks each one: at every node the rank selects a successor by binary
+    search over the cumulative path counts of its successors (in insertion order). No random
+    walks are repeated and no duplicates are discarded. Paths are returned in random order.
+    """
+    if not isinstance(G, CSRGraph):
+        G = CSRGraph.from_networkx(G)
+    rng = random.Random(seed)
+    s, t = G.index[source], G.index[target]
+
+    ways = _path_counts(G, t)
+    if ways[s] == 0:
+        raise ValueError(f"source {source!r} cannot reach target {target!r}")
+
+    cumulative = {}  # node -> (successors, cumulative path counts) over successors with ways > 0
+
+    def successors_of(u):
+        if u not in cumulative:
+            slots, _ = G.successor_slots([u])
+            vs = [v for v in G.succ_idx[slots].tolist() if ways[v] > 0]
+            cumulative[u] = (vs, list(it.accumulate(ways[v] for v in vs)))
+        return cumulative[u]
+
+    paths = []
+    for rank in sample_distinct_ranks(ways[s], k, rng):
+        curr = s
+        path = [curr]
+        while curr != t:
+            vs, cum = successors_of(curr)
+            i = bisect.bisect_right(cum, rank)
+            if i > 0:
+                rank -= cum[i - 1]
+            curr = vs[i]
+            path.append(curr)
+        paths.append([G.labels[i] for i in path])
+
+    return paths
+
+class PathSampler:
+    """
+    Batched uniform source->target path sampler (with replacement).
+
+    Tables are built once: for every node the successors with at least one path to target
+    and their cumulative probabilities ways[v] / ways[u]. counting="exact" derives them from
+    exact integer path counts, counting="log" from log path counts (float64 only).
+    sample() then advances a whole batch of walkers at a time as NumPy arrays; each step
+    picks the successor by a vectorized binary search within the walker's CSR segment.
+    """
+
+    def __init__(self, G, source, target, counting="exact"):
+        if not isinstance(G, CSRGraph):
+            G = CSRGraph.from_networkx(G)
+        self.labels = G.labels
+        self.source, self.target = G.index[source], G.index[target]
+
+        if counting == "log":
+            logw = _log_path_counts(G, self.target)
+            has_path = logw > -np.inf
+        else:
+            ways = _path_counts(G, self.target)
+            has_path = (ways > 0).astype(bool)
+        if not has_path[self.source]:
+            raise ValueError(f"source {source!r} cannot reach target {target!r}")
+
+        # successor slots of live nodes with paths to target (dead ends have no slots)
+        slots, owners = G.successor_slots(np.flatnonzero(G.alive))
+        succ = G.succ_idx[slots].astype(np.int64)
+        keep = has_path[succ]
+        succ, owners = succ[keep], owners[keep]
+        self.succ = succ
+        self.ptr = np.zeros(len(self.labels) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=len(self.labels)), out=self.ptr[1:])
+        self.max_degree = int(np.diff(self.ptr).max()) if len(succ) else 0
+
+        if counting == "log":
+            # per-segment running sums, one vector step per successor position
+            prob = np.exp(logw[succ] - logw[owners])
+            pos = np.arange(len(succ)) - self.ptr[owners]
+            self.cum = prob.copy()
+            by_pos = np.argsort(pos, kind='stable')
+            bounds = np.searchsorted(pos[by_pos], np.arange(self.max_degree + 1))
+            for j in range(1, self.max_degree):
+                at = by_pos[bounds[j]:bounds[j + 1]]
+                self.cum[at] += self.cum[at - 1]
+            # renormalize so the last entry of a segment is exactly 1.0
+            last = self.ptr[owners + 1] - 1
+            self.cum /= self.cum[last]
+        else:
+            # cumulative path counts within each node's segment, divided by the node's count
+            # (exact integers until the division, so the last entry of a segment is exactly 1.0)
+            total = np.cumsum(ways[succ]) if len(succ) else np.zeros(0, dtype=object)
+            before = np.concatenate(([0], total))[self.ptr[owners]]
+            self.cum = ((total - before) / ways[owners]).astype(np.float64)
+
+        self.max_len = len(list(G.topological_generations()))
+
+    def sample(self, n, batch_size=10000, seed=42):
+        """
+        Yield n sampled paths in batches: int arrays of node IDs (rows padded with -1 after
+        target), to be mapped with self.labels. Same seed and batch_size give the same paths.
+        """
+        rng = np.random.default_rng(seed)
+        steps = max(self.max_degree, 1).bit_length()
+        done = 0
+        while done < n:
+            m = min(batch_size, n - done)
+            paths = np.full((m, self.max_len), -1, dtype=np.int64)
+            curr = np.full(m, self.source, dtype=np.int64)
+            paths[:, 0] = curr
+            col = 1
+            active = np.flatnonzero(curr != self.target)
+            while len(active):
+                u = curr[active]
+                r = rng.random(len(active))
+                lo, hi = self.ptr[u].copy(), self.ptr[u + 1].copy()
+                # first slot with cumulative probability > r
+                for _ in range(steps):
+                    go = lo < hi
+                    mid = (lo + hi) // 2
+                    right = go & (self.cum[np.minimum(mid, len(self.cum) - 1)] <= r)
+                    lo = np.where(right, mid + 1, lo)
+                    hi = np.where(go & ~right, mid, hi)
+                curr[active] = self.succ[lo]
+                paths[active, col] = curr[active]
+                col += 1
+                active = active[curr[active] != self.target]
+            done += m
+            yield paths[:, :col]
+
+def export_null_path_batches(batches, labels, template_5to3, out_csv_path, cfg,
+                             protein_name, method="NullWeighted"):
+    """
+    Stream sampled paths (PathSampler.sample batches) to the null-path primer CSV, one
+    chunk per batch. Columns match the per-path null CSV of the comparison scripts.
+    """
+    up = len(cfg.upstream)
+    node_cols = {}  # node ID -> (start, end, strand, primer_seq_5to3)
+
+    def node_row(i):
+        if i not in node_cols:
+            start, end, strand = labels[i]
+            seq = template_5to3[start + up:end + up]
+            seq = (seq if strand == "f" else revcomp(seq)).upper()
+            node_cols[i] = (start, end, strand, seq)
+        return node_cols[i]
+
+    offset = 0
+    with open(out_csv_path, "w", newline="") as f:
+        for k, paths in enumerate(batches):
+            # primer nodes lie between 's' (column 0) and 'd' (last non-padding column)
+            lengths = (paths >= 0).sum(axis=1)
+            inner = (np.arange(paths.shape[1])[None, :] >= 1) & \
+                    (np.arange(paths.shape[1])[None, :] < (lengths - 1)[:, None])
+            rows, cols = np.nonzero(inner)
+            ids = paths[rows, cols]
+
+            cols_by_node = [node_row(i) for i in ids.tolist()]
+            strand = np.array([c[2] for c in cols_by_node])
+            is_f = (strand == "f").astype(np.int64)
+            # pair_id counts forward primers along each path, starting at 0
+            run = np.cumsum(is_f)
+            first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+            base = np.repeat(run[first] - is_f[first], np.diff(np.r_[first, len(rows)]))
+
+            seqs = [c[3] for c in cols_by_node]
+            chunk = pd.DataFrame({
+                "protein_name": protein_name,
+                "method": method,
+                "null_path_id": rows + offset,
+                "primer_order": cols - 1,
+                "pair_id": run - base - 1,
+                "start": [c[0] for c in cols_by_node],
+                "end": [c[1] for c in cols_by_node],
+                "strand": strand,
+                "primer_seq_5to3": seqs,
+                "length": [len(s) for s in seqs],
+            })
+            chunk.to_csv(f, header=(k == 0), index=False)
+            offset += len(paths)
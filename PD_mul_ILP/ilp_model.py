@@ -20,51 +20,38 @@ class ILPResult:
     objective: float
     status: int
 
-def find_forbidden_pairs(protein_names, sequences_nt, args, cfg):
+def live_primers(graph):
+    """(start, stop) of every primer node of a primer graph."""
+    return {(node[0], node[1]) for node in graph.nodes if node not in ('s', 'd')}
 
-    multiple_forbidden_cnt=0
-    single_forbidden_cnt=0
-
-    single_forbidden = {}
-
-    print("Finding intra-protein forbidden pairs constraints")
-
-    total_single = len(protein_names)
-
-    for idx, (protein, sequence) in enumerate(zip(protein_names, sequences_nt), start=1):
-        print(f"[{idx}/{total_single}] Processing {protein}...")
-
-        forbidden_pairs = find_forbidden_pairs_intra(sequence,args, cfg)
-
-        single_forbidden_cnt += len(forbidden_pairs)
-
-        single_forbidden[protein] = forbidden_pairs
+def find_forbidden_pairs(protein_names, sequences_nt, args, cfg, graphs=None):
+    """
+    Find intra- and inter-protein cross-hybridizing primer pairs.
+    graphs: optional dict protein -> primer graph; if given, only pairs of primers that are
+    nodes of the graphs are tested and returned (pairs involving other windows only give
+    empty ILP constraints).
+    """
 
-    print("Number of intra-protein forbidden pairs constraints: ",single_forbidden_cnt)
+    live = [live_primers(graphs[protein]) for protein in protein_names] if graphs is not None else None
 
     # Generate all possible pairs of proteins
     protein_pairs = list(combinations(range(len(protein_names)), 2))
-    total_pairs = len(protein_pairs)
-    multiple_forbidden = {}
-
-    print(f"Finding inter-protein forbidden pairs for {total_pairs} combinations...")
-
-    for idx, (p1, p2) in enumerate(protein_pairs, start=1):
+    single_jobs = [(i, i) for i in range(len(protein_names))]
 
-        print(f"[{idx}/{total_pairs}] Fractions of pairs considered")
+    print(f"Finding forbidden pairs within {len(single_jobs)} proteins and for {len(protein_pairs)} combinations...")
 
-        sequence1 = sequences_nt[p1]
-        sequence2 = sequences_nt[p2]
+    # all intra- and inter-protein searches share one worker pool and task queue
+    forbidden = find_forbidden_pairs_jobs(sequences_nt, single_jobs + protein_pairs, args, cfg,
+                                          live=live, verbose=True)
 
-        protein1 = protein_names[p1]
-        protein2 = protein_names[p2]
+    single_forbidden = {protein_names[i]: forbidden[(i, j)] for i, j in single_jobs}
+    single_forbidden_cnt = sum(len(pairs) for pairs in single_forbidden.values())
 
-        # Find forbidden pairs between two protein sequences
-        forbidden_pairs = find_forbidden_pairs_inter(sequence1,sequence2,args,cfg)
-
-        multiple_forbidden[(protein1,protein2)]= forbidden_pairs
+    print("Number of intra-protein forbidden pairs constraints: ",single_forbidden_cnt)
 
-        multiple_forbidden_cnt += len(forbidden_pairs)
+    multiple_forbidden = {(protein_names[p1], protein_names[p2]): forbidden[(p1, p2)]
+                          for p1, p2 in protein_pairs}
+    multiple_forbidden_cnt = sum(len(pairs) for pairs in multiple_forbidden.values())
 
     print("Number of inter-protein forbidden pairs constraints: ",multiple_forbidden_cnt)
 
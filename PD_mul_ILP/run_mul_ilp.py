@@ -5,10 +5,7 @@ import pandas as pd
 from PD_mul_ILP.create_graphs import *
 from PD_mul_ILP.ilp_model import *
 import ast
-
-def revcomp(seq: str) -> str:
-    comp = str.maketrans("ACGTacgtNn", "TGCAtgcaNn")
-    return seq.translate(comp)[::-1]
+from General.utils import revcomp
 
 def node_to_tuple(node):
     # sometimes nodes are stored as strings like "(12, 34, 'r')"
@@ -86,7 +83,8 @@ def run_mul_ilp(mutreg_regions, sequences_nt, protein_names, args, cfg):
     print("[STEP] Finding forbidden pairs across proteins...")
     t_forbid = time.time()
     single_forbidden, multiple_forbidden, single_pair_cnt, multi_pairs_cnt = find_forbidden_pairs(
-        protein_names, sequences_nt, args, cfg
+        protein_names, sequences_nt, args, cfg,
+        graphs=graphs if args.forbidden_scope == "graph" else None
     )
     forbidden_time = time.time() - t_forbid
     print(f"[DONE] Forbidden pairs in {forbidden_time:.2f} sec "
@@ -6,6 +6,7 @@ import networkx as nx
 from General.primer_graphs import create_primer_df, create_graph
 from General.primer_data import *
 from General.utils import *
+from General.tm_cache import get_tm_cache, format_stats
 import ast
 
 def node_to_tuple(node):
@@ -80,6 +81,7 @@ def run_mul_greedy(
      unresolved,
      per_protein_rows) = run_greedy(sequences_nt, mutreg_regions, protein_names, args, cfg)
     greedy_time = time.time() - t0
+    tm_hits, tm_disk_hits, tm_misses = get_tm_cache(args.tm_cache_size, args.cache_dir, args.cache_max_mb).take_stats()
 
     # ---------- overall summary ----------
     summary_row = {
@@ -91,7 +93,10 @@ def run_mul_greedy(
         "total_reiterations": re_iters,
         "unresolved_proteins_cnt": len(unresolved),
         "unresolved_proteins": ",".join(unresolved),
-        "total_primers": sum(len(p) for p in paths.values())
+        "total_primers": sum(len(p) for p in paths.values()),
+        "tm_cache_hits": tm_hits,
+        "tm_cache_disk_hits": tm_disk_hits,
+        "heterodimer_primer3_calls": tm_misses,
     }
 
     if save_outputs:
@@ -135,6 +140,9 @@ def run_greedy(
     cross_cnt = 0
     re_iterations = 0
     unresolved_proteins: set[str] = set()
+    # primers kept across retries are re-checked against the same selected primers
+    tm_cache = get_tm_cache(args.tm_cache_size, args.cache_dir, args.cache_max_mb)
+    tm_cache.take_stats()  # count this run only
 
     per_protein_rows: list[dict] = []
 
@@ -156,6 +164,9 @@ def run_greedy(
         graph = create_graph(primer_df, len(mutreg_nt), args)
         graph_time = time.time() - t_g0
 
+        # DP values kept across retries; removals only re-solve the affected nodes
+        best_path = IncrementalLongestPath(graph, 's', 'd')
+
         # 3) Iterate until a non-conflicting path is found (or none exists)
         needs_retry = True
         iters_for_this_protein = 0
@@ -167,7 +178,7 @@ def run_greedy(
             iters_for_this_protein += 1
 
             try:
-                lp = longest_path_dag(graph, 's', 'd')[1:-1]
+                lp = best_path.path()[1:-1]
             except NoPathError:
                 print(f"[WARN] No valid path found for {protein_name}. Skipping.")
                 break
@@ -179,14 +190,14 @@ def run_greedy(
             violating_nodes = set()
             for node, pseq in primer_seqs.items():
                 for other_seq in selected_primers:
-                    tm = calc_tm(other_seq, pseq)
+                    tm = tm_cache.tm(other_seq, pseq)
                     if tm >= cfg.max_tm:
                         cross_cnt += 1
                         violating_nodes.add(node)
                         break
 
             if violating_nodes:
-                graph.remove_nodes_from(violating_nodes)
+                best_path.remove_nodes_from(violating_nodes)
                 needs_retry = True
             else:
                 selected_primers.extend(primer_seqs.values())
@@ -215,6 +226,9 @@ def run_greedy(
                                 if path_found else 0.0),
         })
 
+    tm_cache.flush()
+    print(f"[INFO] Cross-hybridization checks: {format_stats(tm_cache.hits, tm_cache.disk_hits, tm_cache.misses)}")
+
     return (
         paths,
         total_efficiency,
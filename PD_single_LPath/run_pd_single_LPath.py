@@ -1,16 +1,23 @@
 import time
+import multiprocessing as mp
 from pathlib import Path
 import pandas as pd
-import networkx as nx
 from General.primer_graphs import create_primer_df, create_graph
+from General.direct_path import longest_path_direct
 from General.utils import *
 
-def run_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
-    """Single-protein shortest-path run:
-    - Build graph
-    - Compute shortest path (s->d)
-    - Save only metadata to CSV
-    - Save the actual path to JSON
+# Worker globals (per-process) for the batch driver
+_G = {}
+
+SELECTED_COLUMNS = ['protein_name','primer_index','start','stop','orientation','seq','efficiency']
+K_BEST_COLUMNS = ['protein_name','path_rank','path_efficiency','primer_index',
+                  'start','stop','orientation','seq','efficiency']
+
+def solve_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
+    """Single-protein longest-path solve, without writing any file.
+
+    Returns (summary row, selected primers DataFrame, k-best primers DataFrame or None,
+    selected primer nodes).
     """
     t0 = time.time()
 
@@ -18,12 +25,23 @@ def run_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
     primer_df = create_primer_df(sequence_nt, args, cfg)
 
     t_graph0 = time.time()
-    graph = create_graph(primer_df, len(mutreg_nt), args)
+    # with --path_engine direct the path is found from primer_df without building the graph
+    # (--k_best always needs the graph)
+    use_graph = args.path_engine == "graph" or args.k_best > 1
+    graph = create_graph(primer_df, len(mutreg_nt), args) if use_graph else None
     graph_time = time.time() - t_graph0
 
     # ---- Longest path (by edge weight) ----
     try:
-        full_path = longest_path_dag(graph, 's', 'd')
+        if graph is None:
+            full_path = longest_path_direct(primer_df, len(mutreg_nt), args)
+            k_best_paths = [full_path]
+        elif args.k_best > 1:
+            k_best_paths = k_longest_paths_dag(graph, 's', 'd', args.k_best)
+            full_path = k_best_paths[0]
+        else:
+            full_path = longest_path_dag(graph, 's', 'd')
+            k_best_paths = [full_path]
         # strip s/d for primer nodes only)
         primer_path_nodes = full_path[1:-1]
         # select primers in path and compute total efficiency
@@ -34,19 +52,52 @@ def run_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
         print(f"[WARN] No valid path found for {protein_name}. Skipping.")
         primer_path_nodes = []
         primer_cost = float('nan')
+        k_best_paths = []
 
     total_time = time.time() - t0
 
     # ---- CSV data ----
     row = {
         "protein_name": protein_name,
-        "graph_nodes": len(graph.nodes),
-        "graph_edges": len(graph.edges),
+        "graph_nodes": len(graph.nodes) if graph is not None else None,
+        "graph_edges": len(graph.edges) if graph is not None else None,
         "graph_time_sec": round(graph_time, 3),
         "longest_path_efficiency": primer_cost,
         "total_time_sec": round(total_time, 3),
         "num_primers": len(primer_path_nodes),
     }
+
+    if len(primer_path_nodes) > 0:
+        primer_set = primer_set.rename(columns={"fr": "orientation"})
+        primer_set.insert(0, "protein_name", protein_name)
+        primer_set.insert(1, "primer_index", range(len(primer_set)))
+        primer_set = primer_set[SELECTED_COLUMNS]
+    else:
+        primer_set = pd.DataFrame()
+
+    k_best_set = None
+    if args.k_best > 1:
+        k_best_sets = []
+        for rank, path in enumerate(k_best_paths):
+            k_set = primer_df.loc[path[1:-1]].copy().reset_index()
+            k_set = k_set.rename(columns={"fr": "orientation"})
+            k_set.insert(0, "protein_name", protein_name)
+            k_set.insert(1, "path_rank", rank)
+            k_set.insert(2, "path_efficiency", float(k_set['efficiency'].sum()))
+            k_set.insert(3, "primer_index", range(len(k_set)))
+            k_best_sets.append(k_set[K_BEST_COLUMNS])
+        k_best_set = pd.concat(k_best_sets, ignore_index=True) if k_best_sets else pd.DataFrame()
+
+    return row, primer_set, k_best_set, primer_path_nodes
+
+def run_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
+    """Single-protein shortest-path run:
+    - Build graph
+    - Compute shortest path (s->d)
+    - Save only metadata to CSV
+    - Save the actual path to JSON
+    """
+    row, primer_set, k_best_set, primer_path_nodes = solve_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg)
     df = pd.DataFrame([row])
 
     # Ensure output directory exists
@@ -61,16 +112,79 @@ def run_longest_path(sequence_nt, mutreg_nt, protein_name, args, cfg):
     paths_csv_path = out_dir / "PD_single_LPath_selected_primers.csv"
 
     # save selected primers in csv
-    if len(primer_path_nodes) > 0:
-        primer_set = primer_set.rename(columns={"fr": "orientation"})
-        primer_set.insert(0, "protein_name", protein_name)
-        primer_set.insert(1, "primer_index", range(len(primer_set)))
-        primer_set = primer_set[['protein_name','primer_index','start','stop','orientation','seq','efficiency']]
-        primer_set.to_csv(paths_csv_path, index=False)
-    else:
-        pd.DataFrame().to_csv(paths_csv_path, index=False)
+    primer_set.to_csv(paths_csv_path, index=False)
 
     print(f"Saved selected primers to: {paths_csv_path}")
 
+    # ---- k-best primer sets CSV ----
+    if k_best_set is not None:
+        k_best_csv_path = out_dir / "PD_single_LPath_k_best_primers.csv"
+        k_best_set.to_csv(k_best_csv_path, index=False)
+        n_sets = k_best_set['path_rank'].nunique() if len(k_best_set) else 0
+        print(f"Saved {n_sets} best primer sets to: {k_best_csv_path}")
+
     return df, primer_path_nodes
 
+def _init_batch_worker(args, cfg):
+    # one primer3 instance, feature cache and flank memo per worker, reused for all proteins
+    args.workers = 1  # no nested feature pools
+    _G["args"] = args
+    _G["cfg"] = cfg
+    _G["PCR"] = get_PCR()
+
+def _solve_batch_task(task):
+    sequence_nt, mutreg_nt, protein_name = task
+    return solve_longest_path(sequence_nt, mutreg_nt, protein_name, _G["args"], _G["cfg"])
+
+def run_longest_path_batch(full_sequences, mutreg_regions, protein_names, args, cfg):
+    """PD-single-LPath on every sequence of the input file.
+
+    Proteins are solved by a pool of args.workers processes (in-process if workers <= 1).
+    Summary rows and selected primers are appended to the CSVs as each protein completes.
+    """
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = out_dir / "PD_single_LPath_results.csv"
+    paths_csv_path = out_dir / "PD_single_LPath_selected_primers.csv"
+    k_best_csv_path = out_dir / "PD_single_LPath_k_best_primers.csv"
+
+    tasks = list(zip(full_sequences, mutreg_regions, protein_names))
+    n_total = len(tasks)
+
+    if args.workers > 1:
+        ctx = mp.get_context("spawn")
+        pool = ctx.Pool(processes=min(args.workers, n_total), initializer=_init_batch_worker,
+                        initargs=(args, cfg))
+        results = pool.imap_unordered(_solve_batch_task, tasks)
+    else:
+        pool = None
+        get_PCR()
+        results = (solve_longest_path(*task, args, cfg) for task in tasks)
+
+    # headers are written with the first row of each file
+    written = {csv_path: False, paths_csv_path: False, k_best_csv_path: False}
+
+    def append(path, df):
+        df.to_csv(path, mode="a" if written[path] else "w", header=not written[path], index=False)
+        written[path] = True
+
+    try:
+        for i, (row, primer_set, k_best_set, _) in enumerate(results, start=1):
+            append(csv_path, pd.DataFrame([row]))
+            if len(primer_set):
+                append(paths_csv_path, primer_set)
+            if k_best_set is not None and len(k_best_set):
+                append(k_best_csv_path, k_best_set)
+            print(f"[INFO] Finished protein {i}/{n_total}: {row['protein_name']}")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    # proteins without any path still leave an (empty) file, as in the single-protein run
+    for path, done in written.items():
+        if not done and (path != k_best_csv_path or args.k_best > 1):
+            pd.DataFrame().to_csv(path, index=False)
+
+    print(f"Saved results of {n_total} proteins to: {csv_path}")
+    print(f"Saved selected primers to: {paths_csv_path}")
@@ -12,7 +12,7 @@ def run_greedy(graph, primer_df,args):
   feasible = True
   for i in range(args.num_proteins):
     nodes_to_remove = []
-    for p,n in it.product(path_ls[-1],graph_sub.nodes()):
+    for p,n in it.product(path_ls[-1],graph_sub.nodes):
       if n=='s' or n=='d':
         continue
       p_start, p_end, _ = p
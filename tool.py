@@ -1,9 +1,8 @@
 from General.args import *
 from General.utils import *
-from PD_var_ILP.run_var_ilp import run_var_ilp
-from PD_mul_ILP.run_mul_ilp import run_mul_ilp
-from PD_mul_greedy.run_mul_greedy import run_mul_greedy
-from PD_single_LPath.run_pd_single_LPath import run_longest_path
+
+# Each version's solver module is imported only when that version is selected, so e.g.
+# PD-single-LPath does not load gurobipy (see docs/Benchmarks.md, Import time).
 
 
 def main():
@@ -18,23 +17,31 @@ def main():
     
     if args.version =="PD-mul-ILP":
 
+        from PD_mul_ILP.run_mul_ilp import run_mul_ilp
         print("Running PD-mul-IL version")
         run_mul_ilp(mutreg_regions,full_sequences,protein_names,args, cfg)
 
     elif args.version == "PD-mul-Greedy":
 
+        from PD_mul_greedy.run_mul_greedy import run_mul_greedy
         print("Running PD-mul-Greedy version")
         run_mul_greedy(full_sequences, mutreg_regions, protein_names,args, cfg)
 
     elif args.version=="PD-var-ILP":
 
+        from PD_var_ILP.run_var_ilp import run_var_ilp
         print("Running PD-var-ILP version")
         run_var_ilp(full_sequences[0], mutreg_regions[0], protein_names[0],args, cfg)
 
     else: 
         
+        from PD_single_LPath.run_pd_single_LPath import run_longest_path, run_longest_path_batch
         print("Running PD-single-LPath version")
-        run_longest_path(full_sequences[0], mutreg_regions[0], protein_names[0],args, cfg)  # only runs on first sequence
+        if args.batch:
+            # every sequence in the file, solved by a pool of args.workers processes
+            run_longest_path_batch(full_sequences, mutreg_regions, protein_names, args, cfg)
+        else:
+            run_longest_path(full_sequences[0], mutreg_regions[0], protein_names[0],args, cfg)  # only runs on first sequence
         
 
 